@@ -2,12 +2,24 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import sqlite3
 import os
-import re
-import PyPDF2
-import docx2txt
+import queue
+import threading
+import time
+from collections import deque
 from database import Database
+from metrics import metrics
+from ingestion import IngestionEngine
+from widgets import VirtualListbox
 
 class ResumeScreeningApp:
+    # Number of search results fetched at a time
+    SEARCH_PAGE_SIZE = 100
+    # Pages of search results kept in the tree; scrolling past them drops
+    # the page at the far end and fetches it again if scrolled back to
+    SEARCH_PAGES_SHOWN = 3
+    # Number of resumes ranked against a job description
+    JOB_MATCH_LIMIT = 100
+    
     def __init__(self, root):
         self.root = root
         self.root.title("AI Resume Screener By Abhishek")
@@ -52,8 +64,18 @@ class ResumeScreeningApp:
         
         self.db = Database()
         self.db.create_tables()
+        if Database.fts5_supported():
+            self.db.enable_fts()
+        if Database.tfidf_supported():
+            self.db.enable_tfidf(os.path.splitext(self.db.db_path)[0] + ".tfidf.npz")
+        self.engine = IngestionEngine(self.db)
+        self.ingest_thread = None
+        self.backfill_thread = None
         
         self.setup_ui()
+        
+        # Finish any keyword backfill interrupted in a previous session
+        self.start_backfill()
     
     def setup_styles(self):
         """Configure modern TTK styles"""
@@ -324,16 +346,19 @@ class ResumeScreeningApp:
         self.upload_tab = self.create_modern_frame(self.notebook)
         self.search_tab = self.create_modern_frame(self.notebook)
         self.keywords_tab = self.create_modern_frame(self.notebook)
+        self.stats_tab = self.create_modern_frame(self.notebook)
         
         # Add tabs with enhanced icons and descriptions
         self.notebook.add(self.upload_tab, text="📁 Upload & Process")
         self.notebook.add(self.search_tab, text="🔍 Smart Search")
         self.notebook.add(self.keywords_tab, text="⚙️ Keyword Manager")
+        self.notebook.add(self.stats_tab, text="📊 Statistics")
         
         # Setup each tab with enhanced functionality
         self.setup_upload_tab()
         self.setup_search_tab()
         self.setup_keywords_tab()
+        self.setup_stats_tab()
     
     def setup_upload_tab(self):
         # Header section
@@ -355,8 +380,13 @@ class ResumeScreeningApp:
         button_frame = tk.Frame(controls_section, bg=self.colors['bg_tertiary'])
         button_frame.pack(pady=20)
         
-        upload_btn = self.create_modern_button(button_frame, "📤 Upload Resumes", self.upload_resumes, width=20, height=2)
-        upload_btn.pack(side=tk.LEFT, padx=5)
+        self.upload_btn = self.create_modern_button(button_frame, "📤 Upload Resumes", self.upload_resumes, width=20, height=2)
+        self.upload_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_btn = self.create_modern_button(button_frame, "⏹️ Cancel Upload", self.cancel_upload,
+                                                  bg_color=self.colors['accent_secondary'], width=20, height=2)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
         
         delete_btn = self.create_modern_button(button_frame, "🗑️ Delete Resume", self.delete_resume, 
                                              bg_color=self.colors['error'], width=20, height=2)
@@ -383,7 +413,6 @@ class ResumeScreeningApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
         
         self.resume_listbox = tk.Listbox(listbox_container, 
-                                        yscrollcommand=scrollbar.set,
                                         bg=self.colors['bg_secondary'],
                                         fg=self.colors['text_primary'],
                                         selectbackground=self.colors['accent_primary'],
@@ -393,7 +422,10 @@ class ResumeScreeningApp:
                                         borderwidth=0,
                                         activestyle='none')
         self.resume_listbox.pack(fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.resume_listbox.yview)
+        
+        # Only the rows on screen are loaded; scrolling fetches the next window
+        self.resume_view = VirtualListbox(self.resume_listbox, scrollbar,
+                                          fetch=self.fetch_resume_rows, count=self.db.count_resumes)
         
         # Bind double-click event
         self.resume_listbox.bind('<Double-1>', self.view_resume_details)
@@ -443,6 +475,30 @@ class ResumeScreeningApp:
         search_btn = self.create_modern_button(input_frame, "🚀 Search", self.search_resumes, width=12, height=1)
         search_btn.pack(side=tk.RIGHT)
         
+        # Job-description matching ranks every resume by TF-IDF similarity
+        if self.db.tfidf is not None:
+            match_btn = self.create_modern_button(input_frame, "📋 Match Job Description",
+                                                  self.match_job_description, width=22, height=1)
+            match_btn.pack(side=tk.RIGHT, padx=(0, 10))
+        
+        # Ranking choice: BM25 needs SQLite with FTS5, TF-IDF needs NumPy and SciPy
+        self.rank_var = tk.StringVar(value="index")
+        rankings = [("index", "⚖️ Keyword weights")]
+        if self.db.has_fts():
+            rankings.append(("fts", "📈 Relevance (BM25)"))
+        if self.db.tfidf is not None:
+            rankings.append(("tfidf", "🧮 Relevance (TF-IDF)"))
+        if len(rankings) > 1:
+            rank_frame = tk.Frame(search_container, bg=self.colors['bg_tertiary'])
+            rank_frame.pack(anchor='w')
+            for mode, text in rankings:
+                tk.Radiobutton(rank_frame, text=text, value=mode, variable=self.rank_var,
+                               bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'],
+                               selectcolor=self.colors['bg_secondary'],
+                               activebackground=self.colors['bg_tertiary'],
+                               activeforeground=self.colors['text_primary'],
+                               font=('Segoe UI', 11)).pack(side=tk.LEFT, padx=(0, 15))
+        
         # Results section
         results_section = self.create_modern_frame(self.search_tab)
         results_section.pack(fill=tk.BOTH, expand=True, padx=30, pady=(0, 30))
@@ -473,15 +529,29 @@ class ResumeScreeningApp:
         self.results_tree.column("phone", width=150)
         self.results_tree.column("score", width=120)
         
-        # Add modern scrollbar
-        scrollbar = tk.Scrollbar(tree_container, orient=tk.VERTICAL, command=self.results_tree.yview,
-                               bg=self.colors['bg_secondary'], troughcolor=self.colors['bg_primary'])
-        self.results_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
+        # Result count, packed first so the tree can't squeeze it out
+        self.results_count_label = self.create_modern_label(tree_container, "", 10, color=self.colors['text_secondary'])
+        self.results_count_label.pack(side=tk.BOTTOM, anchor='w', pady=(10, 0))
+        
+        # Add modern scrollbar; scrolling near the end fetches the next page
+        self.results_scrollbar = tk.Scrollbar(tree_container, orient=tk.VERTICAL, command=self.results_tree.yview,
+                                              bg=self.colors['bg_secondary'], troughcolor=self.colors['bg_primary'])
+        self.results_tree.configure(yscroll=self.on_results_scroll)
+        self.results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
         self.results_tree.pack(fill=tk.BOTH, expand=True)
         
         # Bind double-click event
         self.results_tree.bind('<Double-1>', self.view_search_result)
+        
+        # Current search, paged with a (score, id) cursor
+        self.search_keywords = []
+        self.search_mode = "index"
+        self.search_cursor = None  # cursor after the last page shown
+        self.shown_pages = deque()  # (cursor before the page, row count) of the pages in the tree
+        self.pages_above = []  # the same for pages dropped off the top, nearest last
+        self.loading_results = False
+        # resume ID -> [(term, contribution)] for the current job-description match
+        self.match_terms = {}
     
     def setup_keywords_tab(self):
         # Header section
@@ -588,7 +658,53 @@ class ResumeScreeningApp:
         # Load existing keywords
         self.load_keywords()
     
+    def setup_stats_tab(self):
+        header_section = self.create_modern_frame(self.stats_tab)
+        header_section.pack(fill=tk.X, padx=30, pady=30)
+        
+        title = self.create_modern_label(header_section, "📊 Pipeline Statistics", 18, True)
+        title.pack(anchor='w', padx=20, pady=(20, 5))
+        
+        desc = self.create_modern_label(header_section, "Time spent per stage of ingestion and search, and slow searches", 12, color=self.colors['text_secondary'])
+        desc.pack(anchor='w', padx=20, pady=(0, 10))
+        
+        controls = self.create_modern_frame(header_section)
+        controls.pack(fill=tk.X, padx=20, pady=(0, 20))
+        
+        self.metrics_var = tk.BooleanVar(value=metrics.enabled)
+        metrics_check = tk.Checkbutton(controls, text="⏱️ Record timings",
+                                       variable=self.metrics_var,
+                                       command=lambda: metrics.enable(self.metrics_var.get()),
+                                       bg=self.colors['bg_secondary'], fg=self.colors['text_primary'],
+                                       selectcolor=self.colors['bg_tertiary'],
+                                       activebackground=self.colors['bg_secondary'],
+                                       activeforeground=self.colors['text_primary'],
+                                       font=('Segoe UI', 11))
+        metrics_check.pack(side=tk.LEFT)
+        
+        reset_button = self.create_modern_button(controls, "🔄 Reset", metrics.reset, width=10, height=1)
+        reset_button.pack(side=tk.LEFT, padx=(15, 0))
+        
+        self.stats_text = tk.Text(self.stats_tab, bg=self.colors['bg_secondary'], fg=self.colors['text_primary'],
+                                  font=('Consolas', 11), relief='flat', bd=0, state=tk.DISABLED)
+        self.stats_text.pack(fill=tk.BOTH, expand=True, padx=30, pady=(0, 30))
+        
+        self.refresh_stats()
+    
+    def refresh_stats(self):
+        """Redraw the statistics panel while its tab is showing"""
+        if self.notebook.select() == str(self.stats_tab):
+            self.stats_text.config(state=tk.NORMAL)
+            self.stats_text.delete('1.0', tk.END)
+            self.stats_text.insert('1.0', metrics.format_table())
+            self.stats_text.config(state=tk.DISABLED)
+        self.root.after(1000, self.refresh_stats)
+    
     def upload_resumes(self):
+        if self.ingest_thread is not None:
+            self.show_modern_warning("⏳ Upload Running", "Please wait for the current upload to finish.")
+            return
+        
         filetypes = [
             ("Resume files", "*.pdf;*.docx;*.doc;*.txt"),
             ("PDF files", "*.pdf"),
@@ -606,135 +722,132 @@ class ResumeScreeningApp:
             self.status_label.config(text="⚠️ No files selected", fg=self.colors['warning'])
             return
         
-        processed = 0
-        for filename in filenames:
-            try:
-                # Extract text from resume
-                text = self.extract_text(filename)
-                
-                # Extract candidate information
-                name = self.extract_name(text)
-                email = self.extract_email(text)
-                phone = self.extract_phone(text)
-                
-                # Save to database
-                resume_id = self.db.add_resume(os.path.basename(filename), name, email, phone, text)
-                
-                # Process keywords
-                self.process_keywords(resume_id, text)
-                
-                processed += 1
-                
-            except Exception as e:
-                self.show_modern_error("Processing Error", f"Failed to process {os.path.basename(filename)}: {str(e)}")
-        
-        if processed > 0:
-            self.status_label.config(text=f"✅ Successfully processed {processed} resume(s)", fg=self.colors['success'])
-            self.load_resumes()
-        else:
-            self.status_label.config(text="❌ No resumes were processed", fg=self.colors['error'])
-    
-    def extract_text(self, filename):
-        file_ext = os.path.splitext(filename)[1].lower()
+        # Parse and persist on a background thread so the window stays responsive
+        self.ingest_cancel = threading.Event()
+        self.ingest_queue = queue.Queue()
+        self.ingest_total = len(filenames)
+        self.ingest_started = time.time()
         
-        if file_ext == '.pdf':
-            return self.extract_text_from_pdf(filename)
-        elif file_ext in ['.docx', '.doc']:
-            return self.extract_text_from_docx(filename)
-        elif file_ext == '.txt':
-            with open(filename, 'r', encoding='utf-8', errors='ignore') as file:
-                return file.read()
-        else:
-            raise ValueError(f"Unsupported file format: {file_ext}")
-    
-    def extract_text_from_pdf(self, filename):
-        text = ""
-        with open(filename, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
-    
-    def extract_text_from_docx(self, filename):
-        return docx2txt.process(filename)
-    
-    def extract_name(self, text):
-        # Simple name extraction - first line or first capitalized words
-        lines = text.split('\n')
-        for line in lines[:10]:  # Check first 10 lines
-            line = line.strip()
-            if line and not re.match(r'^[\W_]+$', line):  # Not just special characters
-                # Return first line that looks like a name (no special chars, reasonable length)
-                if len(line) < 50 and not re.search(r'@|http|www|\.com', line.lower()):
-                    return line
-        
-        # Fallback: look for capitalized words
-        name_match = re.search(r'([A-Z][a-z]+ [A-Z][a-z]+)', text)
-        if name_match:
-            return name_match.group(1)
-        
-        return "Unknown"
-    
-    def extract_email(self, text):
-        email_match = re.search(r'[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}', text)
-        if email_match:
-            return email_match.group(0)
-        return "Unknown"
-    
-    def extract_phone(self, text):
-        # Look for phone numbers in various formats
-        phone_patterns = [
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # 123-456-7890 or 123.456.7890
-            r'\(\d{3}\)[-. ]?\d{3}[-.]?\d{4}',  # (123) 456-7890
-            r'\+\d{1,2}[-. ]?\d{3}[-. ]?\d{3}[-. ]?\d{4}'  # +1 123-456-7890
-        ]
+        self.upload_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.status_label.config(text=f"⏳ Processing 0/{self.ingest_total} resume(s)...", fg=self.colors['warning'])
         
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, text)
-            if phone_match:
-                return phone_match.group(0)
-        
-        return "Unknown"
+        self.ingest_thread = threading.Thread(target=self.run_ingestion, args=(list(filenames),), daemon=True)
+        self.ingest_thread.start()
+        self.root.after(100, self.poll_ingestion)
     
-    def process_keywords(self, resume_id, text):
-        # Get all keywords
-        keywords = self.db.get_all_keywords()
-        
-        for keyword_id, keyword, weight in keywords:
-            # Count occurrences of keyword in text (case insensitive)
-            count = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text, re.IGNORECASE))
-            
-            if count > 0:
-                # Add keyword match to database
-                self.db.add_keyword_match(resume_id, keyword_id, count)
+    def run_ingestion(self, filenames):
+        """Ingest resumes on the background thread, posting updates to the UI queue"""
+        try:
+            # The Database gives this thread its own connection
+            report = self.engine.ingest(filenames,
+                                        progress=lambda done, total: self.ingest_queue.put(('progress', done)),
+                                        cancel=self.ingest_cancel)
+            self.ingest_queue.put(('done', report))
+        except Exception as e:
+            self.ingest_queue.put(('failed', str(e)))
     
-    def load_resumes(self):
-        # Clear listbox
-        self.resume_listbox.delete(0, tk.END)
+    def poll_ingestion(self):
+        """Apply queued ingestion updates on the Tk event loop"""
+        done = None
+        try:
+            while True:
+                kind, payload = self.ingest_queue.get_nowait()
+                if kind == 'progress':
+                    done = payload
+                else:
+                    self.finish_ingestion(kind, payload)
+                    return
+        except queue.Empty:
+            pass
+        
+        if done is not None and not self.ingest_cancel.is_set():
+            elapsed = max(time.time() - self.ingest_started, 1e-6)
+            rate = done / elapsed
+            eta = (self.ingest_total - done) / rate if rate else 0
+            self.status_label.config(
+                text=f"⏳ Processing {done}/{self.ingest_total} resume(s) | {rate:.1f} files/s | ETA {int(eta // 60)}m {int(eta % 60)}s",
+                fg=self.colors['warning'])
+        
+        self.root.after(100, self.poll_ingestion)
+    
+    def cancel_upload(self):
+        """Ask the running ingestion to stop after the current file"""
+        if self.ingest_thread is not None and self.ingest_thread.is_alive():
+            self.ingest_cancel.set()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.status_label.config(text="⏳ Cancelling upload...", fg=self.colors['warning'])
+    
+    def shutdown(self):
+        """Stop a running upload and write out what it has parsed before the process exits"""
+        if self.ingest_thread is not None and self.ingest_thread.is_alive():
+            self.ingest_cancel.set()
+            self.ingest_thread.join()
+        self.engine.close()
+    
+    def finish_ingestion(self, kind, payload):
+        """Restore the upload controls and summarize the finished batch"""
+        self.ingest_thread = None
+        self.upload_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        
+        if kind == 'failed':
+            self.status_label.config(text="❌ No resumes were processed", fg=self.colors['error'])
+            self.show_modern_error("Processing Error", f"Upload failed: {payload}")
+            return
         
-        # Get all resumes from database
-        resumes = self.db.get_all_resumes()
+        processed = sum(1 for _, _, error, duplicate in payload if error is None and not duplicate)
+        duplicates = sum(1 for _, _, error, duplicate in payload if error is None and duplicate)
+        errors = [(filename, error) for filename, _, error, _ in payload if error is not None]
+        
+        if processed > 0 or duplicates > 0:
+            summary = f"✅ Successfully processed {processed} resume(s)"
+            if duplicates:
+                summary += f", {duplicates} duplicate(s) already stored"
+            if self.ingest_cancel.is_set():
+                summary += f" (cancelled, {self.ingest_total - len(payload)} skipped)"
+            self.status_label.config(text=summary, fg=self.colors['success'])
+            self.load_resumes()
+        elif self.ingest_cancel.is_set():
+            self.status_label.config(text="⚠️ Upload cancelled", fg=self.colors['warning'])
+        else:
+            self.status_label.config(text="❌ No resumes were processed", fg=self.colors['error'])
         
-        # Add to listbox with modern formatting
-        for resume in resumes:
-            resume_id, filename, name, email, phone, _ = resume
-            display_text = f"📄 {name} | 📧 {email} | 📱 {phone}"
-            self.resume_listbox.insert(tk.END, display_text)
+        # Report all failures in one dialog instead of one per file
+        if errors:
+            lines = [f"{os.path.basename(filename)}: {error}" for filename, error in errors[:5]]
+            if len(errors) > 5:
+                lines.append(f"...and {len(errors) - 5} more")
+            self.show_modern_error("Processing Error",
+                                   f"Failed to process {len(errors)} file(s):\n" + "\n".join(lines))
+    
+    def load_resumes(self):
+        # Re-read the resume count and the visible window of rows
+        self.resume_view.refresh()
+    
+    def fetch_resume_rows(self, offset, limit):
+        """Get (resume ID, display text) rows for the resume list window"""
+        rows = []
+        with metrics.timer("render"):
+            for resume_id, filename, name, email, phone in self.db.get_resume_summaries(limit, offset):
+                rows.append((resume_id, f"📄 {name} | 📧 {email} | 📱 {phone}"))
+        return rows
+    
+    def selected_resume_id(self):
+        """Get the ID of the selected resume, or None"""
+        return self.resume_view.selected_key()
     
     def view_resume_details(self, event):
-        # Get selected index
-        selection = self.resume_listbox.curselection()
-        if not selection:
+        # Get selected resume
+        resume_id = self.selected_resume_id()
+        if resume_id is None:
             return
         
-        index = selection[0]
-        
         # Get resume from database
-        resumes = self.db.get_all_resumes()
-        if index >= len(resumes):
+        resume = self.db.get_resume_by_id(resume_id)
+        if not resume:
             return
         
-        resume = resumes[index]
         resume_id, filename, name, email, phone, text = resume
         
         # Create modern popup window
@@ -785,6 +898,17 @@ class ResumeScreeningApp:
         keywords_label = self.create_modern_label(info_frame, keywords_text, 10, color=self.colors['text_secondary'])
         keywords_label.pack(anchor='w', padx=20, pady=(0, 15))
         
+        # Near-duplicates found when either resume was stored
+        near_duplicates = self.db.get_near_duplicates(resume_id)
+        if near_duplicates:
+            duplicates_title = self.create_modern_label(info_frame, "👥 Possible Duplicates", 12, True)
+            duplicates_title.pack(anchor='w', padx=20, pady=(0, 5))
+            duplicates_text = "\n".join(f"• #{other_id} {other_filename} ({other_name}), {similarity:.0%} similar"
+                                        for other_id, other_filename, other_name, similarity in near_duplicates)
+            duplicates_label = self.create_modern_label(info_frame, duplicates_text, 10,
+                                                        color=self.colors['warning'])
+            duplicates_label.pack(anchor='w', padx=20, pady=(0, 15))
+        
         # Content section
         content_title = self.create_modern_label(content_frame, "📝 Resume Content", 14, True)
         content_title.pack(anchor='w', padx=20, pady=(10, 5))
@@ -823,19 +947,149 @@ class ResumeScreeningApp:
         keywords = [k.strip() for k in search_text.split(',')]
         
         # Clear previous results
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+        self.clear_results()
         
-        # Search resumes
-        results = self.db.search_resumes(keywords)
+        # Search resumes, fetching only the first page
+        self.match_terms = {}
+        self.search_keywords = keywords
+        self.search_mode = self.rank_var.get()
+        self.load_more_results()
         
         # Display results with enhanced feedback
-        if results:
+        if not self.results_tree.get_children():
+            self.show_modern_warning("🔍 No Results", "No resumes found matching the specified keywords.")
+    
+    def match_job_description(self):
+        """Ask for a job description and rank every resume against it"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("📋 Match Job Description")
+        dialog.geometry("600x450")
+        dialog.configure(bg=self.colors['bg_primary'])
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        content = self.create_modern_frame(dialog)
+        content.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        label = self.create_modern_label(content, "Paste the job description:", 12, True)
+        label.pack(anchor='w', padx=10, pady=(10, 5))
+        
+        text_widget = tk.Text(content, wrap=tk.WORD, height=15,
+                              bg=self.colors['bg_secondary'], fg=self.colors['text_primary'],
+                              font=('Segoe UI', 11), relief='flat',
+                              insertbackground=self.colors['text_primary'])
+        text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        text_widget.focus_set()
+        
+        def on_match():
+            description = text_widget.get("1.0", tk.END).strip()
+            if not description:
+                self.show_modern_warning("⚠️ Job Description Required", "Please paste a job description to match.")
+                return
+            dialog.destroy()
+            self.show_job_matches(description)
+        
+        match_btn = self.create_modern_button(content, "🎯 Match", on_match, self.colors['success'], 12, 1)
+        match_btn.pack(pady=(0, 10))
+    
+    def show_job_matches(self, description):
+        """Replace the results with the resumes best matching a job description"""
+        self.clear_results()
+        
+        results = self.db.match_job_description(description, self.JOB_MATCH_LIMIT)
+        self.match_terms = {}
+        with metrics.timer("render"):
+            for resume_id, name, email, phone, score, terms in results:
+                self.match_terms[resume_id] = terms
+                self.results_tree.insert("", tk.END, values=(resume_id, name, email, phone, f"{score:.3f}"))
+        
+        self.results_count_label.config(text=f"Top {len(results)} match(es) for the job description"
+                                        if results else "")
+        if not results:
+            self.show_modern_warning("🔍 No Results", "No resumes share any words with the job description.")
+    
+    def clear_results(self):
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.search_cursor = None
+        self.shown_pages.clear()
+        self.pages_above = []
+    
+    def load_more_results(self):
+        """Append the next page of results for the current search, dropping the top page if over the cap"""
+        start = self.search_cursor
+        results, self.search_cursor = self.db.search_resumes_page(
+            self.search_keywords, self.SEARCH_PAGE_SIZE, start, self.search_mode)
+        
+        with metrics.timer("render"):
             for result in results:
                 resume_id, name, email, phone, score = result
                 self.results_tree.insert("", tk.END, values=(resume_id, name, email, phone, f"{score:.2f}"))
+            self.shown_pages.append((start, len(results)))
+            
+            if len(self.shown_pages) > self.SEARCH_PAGES_SHOWN:
+                page = self.shown_pages.popleft()
+                self.pages_above.append(page)
+                self.drop_result_rows(0, page[1], shift=-page[1])
+        
+        self.update_results_count()
+        self.loading_results = False
+    
+    def load_previous_results(self):
+        """Fetch back the page above the tree, dropping the bottom page"""
+        start, _ = self.pages_above.pop()
+        results, _ = self.db.search_resumes_page(
+            self.search_keywords, self.SEARCH_PAGE_SIZE, start, self.search_mode)
+        
+        with metrics.timer("render"):
+            for index, result in enumerate(results):
+                resume_id, name, email, phone, score = result
+                self.results_tree.insert("", index, values=(resume_id, name, email, phone, f"{score:.2f}"))
+            self.shown_pages.appendleft((start, len(results)))
+            
+            # The next page down starts where the dropped page did
+            self.search_cursor, count = self.shown_pages.pop()
+            children = self.results_tree.get_children()
+            self.drop_result_rows(len(children) - count, len(children), shift=len(results))
+        
+        self.update_results_count()
+        self.loading_results = False
+    
+    def drop_result_rows(self, first, last, shift):
+        """Delete rows first to last of the tree, keeping the same rows in view.
+
+        shift is how many rows the rows in view moved down by.
+        """
+        children = self.results_tree.get_children()
+        top = self.results_tree.yview()[0] * len(children)
+        self.results_tree.delete(*children[first:last])
+        remaining = len(children) - (last - first)
+        if remaining:
+            self.results_tree.yview_moveto(max(0, top + shift) / remaining)
+    
+    def update_results_count(self):
+        shown = len(self.results_tree.get_children())
+        above = sum(count for _, count in self.pages_above)
+        more = "+" if self.search_cursor is not None else ""
+        if not shown:
+            text = ""
+        elif above:
+            text = f"Showing results {above + 1}-{above + shown}{more}"
         else:
-            self.show_modern_warning("🔍 No Results", "No resumes found matching the specified keywords.")
+            text = f"Showing {shown}{more} result(s)"
+        self.results_count_label.config(text=text)
+    
+    def on_results_scroll(self, first, last):
+        """Update the results scrollbar and fetch the next or previous page near either end"""
+        self.results_scrollbar.set(first, last)
+        if self.loading_results:
+            return
+        
+        if float(last) >= 0.9 and self.search_cursor is not None:
+            self.loading_results = True
+            self.root.after_idle(self.load_more_results)
+        elif float(first) <= 0.1 and self.pages_above:
+            self.loading_results = True
+            self.root.after_idle(self.load_previous_results)
     
     def view_search_result(self, event):
         # Get selected item
@@ -883,6 +1137,20 @@ class ResumeScreeningApp:
         keywords_label = tk.Label(details_frame, text=keywords_text, justify=tk.LEFT)
         keywords_label.pack(anchor="w", padx=10)
         
+        # Terms that matched the current job description, strongest first
+        terms = self.match_terms.get(int(resume_id))
+        if terms:
+            tk.Label(details_frame, text="Job Description Terms:", font=("Arial", 10, "bold")).pack(anchor="w", padx=10, pady=(10, 0))
+            terms_text = ", ".join(f"{term} ({contribution:.3f})" for term, contribution in terms)
+            tk.Label(details_frame, text=terms_text, justify=tk.LEFT, wraplength=560).pack(anchor="w", padx=10)
+        
+        near_duplicates = self.db.get_near_duplicates(resume_id)
+        if near_duplicates:
+            tk.Label(details_frame, text="Possible Duplicates:", font=("Arial", 10, "bold")).pack(anchor="w", padx=10, pady=(10, 0))
+            duplicates_text = "\n".join(f"#{other_id} {other_filename} ({other_name}), {similarity:.0%} similar"
+                                        for other_id, other_filename, other_name, similarity in near_duplicates)
+            tk.Label(details_frame, text=duplicates_text, justify=tk.LEFT).pack(anchor="w", padx=10)
+        
         # Resume text
         text_frame = tk.Frame(popup)
         text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -923,6 +1191,9 @@ class ResumeScreeningApp:
         # Add to treeview
         self.keywords_tree.insert("", tk.END, values=(keyword_id, keyword, weight))
         
+        # Score already stored resumes for the new keyword
+        self.start_backfill()
+        
         # Clear entries
         self.keyword_entry.delete(0, tk.END)
         self.weight_entry.delete(0, tk.END)
@@ -930,6 +1201,44 @@ class ResumeScreeningApp:
         
         self.show_modern_success("✅ Keyword Added", f"Keyword '{keyword}' with weight {weight} added successfully!")
     
+    def start_backfill(self):
+        """Score stored resumes for newly added keywords on a background thread"""
+        if self.backfill_thread is not None:
+            # Pick up keywords added meanwhile once the running backfill ends
+            self.backfill_again = True
+            return
+        
+        self.backfill_again = False
+        self.backfill_queue = queue.Queue()
+        self.backfill_thread = threading.Thread(target=self.run_backfill, daemon=True)
+        self.backfill_thread.start()
+        self.root.after(200, self.poll_backfill)
+    
+    def run_backfill(self):
+        """Run pending keyword backfills on the background thread"""
+        try:
+            # The Database gives this thread its own connection
+            self.backfill_queue.put(('done', self.engine.backfill_keywords()))
+        except Exception as e:
+            self.backfill_queue.put(('failed', str(e)))
+    
+    def poll_backfill(self):
+        """Report a finished keyword backfill on the Tk event loop"""
+        try:
+            kind, payload = self.backfill_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(200, self.poll_backfill)
+            return
+        
+        self.backfill_thread = None
+        if kind == 'failed':
+            self.status_label.config(text=f"❌ Keyword backfill failed: {payload}", fg=self.colors['error'])
+        elif payload:
+            self.status_label.config(text=f"✅ Scored {payload} stored resume(s) for new keywords", fg=self.colors['success'])
+        
+        if self.backfill_again:
+            self.start_backfill()
+    
     def delete_keyword(self):
         # Get selected item
         selection = self.keywords_tree.selection()
@@ -955,28 +1264,25 @@ class ResumeScreeningApp:
     def delete_resume(self):
         """Delete selected resume"""
         # Get selected resume
-        selection = self.resume_listbox.curselection()
-        if not selection:
+        resume_id = self.selected_resume_id()
+        if resume_id is None:
             self.show_modern_warning("⚠️ Selection Required", "Please select a resume to delete.")
             return
         
-        index = selection[0]
-        
-        # Get resume from database
-        resumes = self.db.get_all_resumes()
-        if index >= len(resumes):
+        # Get resume summary from database
+        resume = self.db.get_resume_summary(resume_id)
+        if not resume:
             return
         
-        resume = resumes[index]
-        resume_id, filename, name, email, phone, _ = resume
+        _, filename, name, email, phone = resume
         
         # Confirm deletion
         if self.show_modern_confirm("🗑️ Confirm Deletion", 
                                   f"Are you sure you want to delete the resume for {name}?\nThis action cannot be undone."):
             # Delete from database
             if self.db.delete_resume(resume_id):
-                # Update listbox
-                self.load_resumes()
+                # Update the visible window of the list
+                self.resume_view.refresh()
                 self.show_modern_success("✅ Resume Deleted", 
                                        f"Resume for {name} has been successfully deleted.")
             else:
@@ -1000,7 +1306,14 @@ class ResumeScreeningApp:
 def main():
     root = tk.Tk()
     app = ResumeScreeningApp(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        # The writer and upload threads are daemons; flush them before exiting
+        app.shutdown()
+    # Keep the TF-IDF matrix so the next start-up doesn't rebuild it
+    if app.db.tfidf is not None:
+        app.db.tfidf.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import os
+import time
+from database import Database
+
+# Benchmark: per-row commits vs. bulk single-transaction writes
+#
+#   python benchmark_bulk_writes.py [resumes] [matches_per_resume]
+
+BENCH_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_bulk_writes.db")
+
+
+def fresh_database():
+    if os.path.exists(BENCH_DB_PATH):
+        os.remove(BENCH_DB_PATH)
+    db = Database(BENCH_DB_PATH)
+    db.create_tables()
+    return db
+
+
+def make_rows(resume_count, matches_per_resume):
+    resumes = [(f"resume{i}.txt", f"Candidate {i}", f"candidate{i}@example.com",
+                "123-456-7890", "Python developer with SQL experience. " * 50)
+               for i in range(resume_count)]
+    keywords = [(f"skill{i}", 5) for i in range(matches_per_resume)]
+    return resumes, keywords
+
+
+def run_per_row(resumes, keywords):
+    db = fresh_database()
+    keyword_ids = [db.add_keyword(keyword, weight) for keyword, weight in keywords]
+
+    start = time.perf_counter()
+    for resume in resumes:
+        resume_id = db.add_resume(*resume)
+        for keyword_id in keyword_ids:
+            db.add_keyword_match(resume_id, keyword_id, 1)
+    return time.perf_counter() - start
+
+
+def run_bulk(resumes, keywords):
+    db = fresh_database()
+    keyword_ids = [db.add_keyword(keyword, weight) for keyword, weight in keywords]
+
+    start = time.perf_counter()
+    resume_ids = db.add_resumes_bulk(resumes, commit=False)
+    db.add_keyword_matches_bulk(((resume_id, keyword_id, 1)
+                                 for resume_id in resume_ids
+                                 for keyword_id in keyword_ids), commit=False)
+    db.commit()
+    return time.perf_counter() - start
+
+
+def main(resume_count=200, matches_per_resume=40):
+    resumes, keywords = make_rows(resume_count, matches_per_resume)
+    rows = resume_count * (1 + matches_per_resume)
+
+    print(f"Writing {resume_count} resumes with {matches_per_resume} keyword matches each ({rows} rows)")
+    print("-" * 40)
+    for label, run in (("per-row commits", run_per_row), ("bulk transaction", run_bulk)):
+        elapsed = run(resumes, keywords)
+        print(f"  {label:<18} {elapsed:8.3f}s  {rows / elapsed:12.0f} rows/s")
+
+    os.remove(BENCH_DB_PATH)
+
+
+if __name__ == "__main__":
+    import sys
+    main(*[int(arg) for arg in sys.argv[1:3]])
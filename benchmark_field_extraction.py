@@ -0,0 +1,93 @@
+import random
+import re
+import time
+import ingestion
+from field_extractor import FieldExtractor
+
+# Benchmark: the original per-field extraction (whole text, one regex at a
+# time) vs. FieldExtractor (capped head) at several resume sizes
+#
+#   python benchmark_field_extraction.py [resumes] [paragraphs ...]
+
+WORDS = ("python developer sql machine learning data analysis aws docker react "
+         "project team led built designed improved pipeline service customer").split()
+
+
+# The extraction the pipeline used before FieldExtractor, kept as the baseline
+def extract_name(text):
+    lines = text.split('\n')
+    for line in lines[:10]:
+        line = line.strip()
+        if line and not re.match(r'^[\W_]+$', line):
+            if len(line) < 50 and not re.search(r'@|http|www|\.com', line.lower()):
+                return line
+
+    name_match = re.search(r'([A-Z][a-z]+ [A-Z][a-z]+)', text)
+    if name_match:
+        return name_match.group(1)
+    return "Unknown"
+
+
+def extract_email(text):
+    email_match = re.search(r'[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}', text)
+    if email_match:
+        return email_match.group(0)
+    return "Unknown"
+
+
+def extract_phone(text):
+    phone_patterns = [
+        r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
+        r'\(\d{3}\)[-. ]?\d{3}[-.]?\d{4}',
+        r'\+\d{1,2}[-. ]?\d{3}[-. ]?\d{3}[-. ]?\d{4}'
+    ]
+    for pattern in phone_patterns:
+        phone_match = re.search(pattern, text)
+        if phone_match:
+            return phone_match.group(0)
+    return "Unknown"
+
+
+def make_resumes(resume_count, paragraphs):
+    rng = random.Random(42)
+    resumes = []
+    for i in range(resume_count):
+        body = "\n".join(" ".join(rng.choice(WORDS) for _ in range(60)) for _ in range(paragraphs))
+        # Some resumes carry no phone number, the slow case: the whole text is searched
+        phone = f"+1 555-{i % 1000:03d}-{i % 10000:04d}\n" if i % 3 else ""
+        resumes.append(f"Candidate {i}\ncandidate{i}@example.com\n{phone}{body}")
+    return resumes
+
+
+def run_legacy(resumes):
+    start = time.perf_counter()
+    for text in resumes:
+        extract_name(text)
+        extract_email(text)
+        extract_phone(text)
+    return time.perf_counter() - start
+
+
+def run_field_extractor(resumes):
+    extractor = FieldExtractor(head_chars=ingestion.CONTACT_HEAD_CHARS)
+    start = time.perf_counter()
+    for text in resumes:
+        extractor.extract(text)
+    return time.perf_counter() - start
+
+
+def main(resume_count=2000, paragraph_counts=(5, 10, 40)):
+    print(f"Extracting fields from {resume_count} resumes per size (us/resume)")
+    print(f"  {'size':>10} {'legacy':>10} {'extractor':>10}")
+    for paragraphs in paragraph_counts:
+        resumes = make_resumes(resume_count, paragraphs)
+        chars = sum(len(text) for text in resumes) // resume_count
+        legacy = run_legacy(resumes) / resume_count * 1e6
+        extractor = run_field_extractor(resumes) / resume_count * 1e6
+        print(f"  {chars:>9}c {legacy:10.1f} {extractor:10.1f}")
+
+
+if __name__ == "__main__":
+    import sys
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args[:1] + ([args[1:]] if args[1:] else [])))
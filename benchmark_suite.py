@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import docx
+from database import Database
+from ingestion import IngestionEngine, count_keywords, extract_text
+from pdf_fixture import make_pdf
+
+# Benchmark suite over a deterministic synthetic resume corpus
+#
+#   python benchmark_suite.py [--sizes 1000 10000 100000] [--keyword-sets 10 100 500]
+#                             [--output benchmark_results.json]
+#
+# Times extract_text (TXT, DOCX and PDF), keyword matching and
+# process_keywords, add_resume and bulk inserts, search_resumes and
+# get_keyword_matches for every corpus size and keyword-set size, plus
+# building the TF-IDF matrix and job-description matching when NumPy and
+# SciPy are installed, and writes the results as JSON so runs of
+# different versions can be diffed.
+
+SKILLS = ("Python Java JavaScript TypeScript SQL PostgreSQL MySQL MongoDB Redis Kafka Spark Hadoop "
+          "Docker Kubernetes Terraform Ansible AWS Azure GCP Linux Git Jenkins React Angular Vue "
+          "Node.js Django Flask FastAPI Spring Go Rust C++ C# Scala Kotlin Swift Pandas NumPy "
+          "TensorFlow PyTorch Tableau Excel Jira Agile Scrum GraphQL REST Microservices").split()
+PHRASES = ("Machine Learning", "Data Analysis", "Project Management", "Unit Testing",
+           "Continuous Integration", "Natural Language Processing", "Computer Vision")
+FILLER = ("designed built led improved migrated maintained delivered optimized automated reviewed "
+          "scalable reliable distributed internal customer facing platform service pipeline team "
+          "product features latency throughput costs reporting dashboards stakeholders").split()
+FIRST_NAMES = ("James Mary Robert Patricia John Jennifer Michael Linda David Elizabeth William "
+               "Barbara Richard Susan Joseph Jessica Thomas Sarah Charles Karen").split()
+LAST_NAMES = ("Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez Hernandez "
+              "Lopez Gonzalez Wilson Anderson Thomas Taylor Moore Jackson Martin").split()
+
+
+def keyword_vocabulary(size):
+    """The first `size` keywords: real skills and phrases, then synthetic tool names"""
+    vocabulary = list(SKILLS) + list(PHRASES)
+    vocabulary += [f"Tool{i:04d}" for i in range(max(0, size - len(vocabulary)))]
+    return vocabulary[:size]
+
+
+def make_resume_text(index, rng, vocabulary):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [name, f"{name.lower().replace(' ', '.')}{index}@example.com",
+             f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}", ""]
+    for _ in range(rng.randint(8, 20)):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(10, 20))]
+        for _ in range(rng.randint(1, 4)):
+            words.insert(rng.randrange(len(words)), rng.choice(vocabulary))
+        lines.append(" ".join(words).capitalize() + ".")
+    return "\n".join(lines)
+
+
+def make_corpus(size, seed=42, vocabulary_size=500):
+    """Deterministic list of `size` resume texts"""
+    rng = random.Random(seed)
+    vocabulary = keyword_vocabulary(vocabulary_size)
+    return [make_resume_text(index, rng, vocabulary) for index in range(size)]
+
+
+def write_txt(path, text):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text)
+
+
+def write_docx(path, text):
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def write_pdf(path, text):
+    """Write a minimal PDF with one line of text per row, 50 rows a page"""
+    lines = text.split("\n")
+    with open(path, 'wb') as file:
+        file.write(make_pdf(["\n".join(lines[start:start + 50]) for start in range(0, len(lines), 50)]))
+
+
+WRITERS = {'txt': write_txt, 'docx': write_docx, 'pdf': write_pdf}
+
+
+class Results:
+    def __init__(self):
+        self.rows = []
+
+    def time(self, benchmark, operations, run, **labels):
+        """Time run() performing `operations` operations and record the result"""
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        row = dict(benchmark=benchmark, **labels, operations=operations, seconds=round(seconds, 6),
+                   ms_per_op=round(seconds * 1000 / operations, 6) if operations else None)
+        self.rows.append(row)
+
+        label = " ".join(f"{key}={value}" for key, value in labels.items())
+        print(f"  {benchmark:<22} {label:<28} {operations:>8} ops {seconds:9.3f}s "
+              f"{row['ms_per_op'] or 0:10.4f} ms/op", flush=True)
+        return row
+
+
+def bench_extraction(results, corpus, size, tmp_dir, sample):
+    texts = corpus[:sample]
+    for file_format, write in WRITERS.items():
+        paths = []
+        for index, text in enumerate(texts):
+            path = os.path.join(tmp_dir, f"resume{index}.{file_format}")
+            write(path, text)
+            paths.append(path)
+        results.time("extract_text", len(paths), lambda: [extract_text(path) for path in paths],
+                     size=size, format=file_format)
+
+
+def bench_database(results, corpus, size, keyword_set_sizes, db_path, sample, queries, rng):
+    db = Database(db_path)
+    db.create_tables()
+
+    results.time("add_resume", sample, lambda: [
+        db.add_resume(f"resume{index}.txt", "", "", "", text)
+        for index, text in enumerate(corpus[:sample])], size=size)
+    rows = [(f"resume{index}.txt", "", "", "", text) for index, text in enumerate(corpus[sample:], start=sample)]
+    results.time("add_resumes_bulk", len(rows), lambda: db.add_resumes_bulk(rows), size=size)
+
+    engine = IngestionEngine(db)
+    resume_ids = [resume_id for resume_id, _ in db.get_resume_contents(0, len(corpus))]
+    for keyword_count in keyword_set_sizes:
+        # Replace the keyword set and its matches
+        for keyword_id, _, _ in db.get_all_keywords():
+            db.delete_keyword(keyword_id)
+        for keyword in keyword_vocabulary(keyword_count):
+            db.add_keyword(keyword, rng.randint(1, 10))
+        keywords = db.get_all_keywords()
+        db.finish_backfills([keyword_id for keyword_id, _, _ in keywords])
+
+        results.time("count_keywords", size, lambda: [count_keywords(text, keywords) for text in corpus],
+                     size=size, keywords=keyword_count)
+        results.time("process_keywords", size, lambda: [
+            engine.process_keywords(resume_id, text) for resume_id, text in zip(resume_ids, corpus)],
+            size=size, keywords=keyword_count)
+
+        searches = [rng.sample([keyword for _, keyword, _ in keywords], min(3, keyword_count))
+                    for _ in range(queries)]
+        results.time("search_resumes", queries, lambda: [db.search_resumes(search) for search in searches],
+                     size=size, keywords=keyword_count)
+        results.time("search_resumes_page", queries, lambda: [
+            db.search_resumes_page(search, limit=50) for search in searches], size=size, keywords=keyword_count)
+
+        lookups = [rng.choice(resume_ids) for _ in range(queries * 10)]
+        results.time("get_keyword_matches", len(lookups), lambda: [
+            db.get_keyword_matches(resume_id) for resume_id in lookups], size=size, keywords=keyword_count)
+
+    if Database.tfidf_supported():
+        index = db.enable_tfidf()
+        results.time("tfidf_build", size, index.sync, size=size)
+        descriptions = [" ".join(rng.choice(FILLER + list(SKILLS)) for _ in range(300)) for _ in range(queries)]
+        results.time("match_job_description", queries, lambda: [
+            db.match_job_description(description) for description in descriptions], size=size)
+
+    engine.close()
+    db.close()
+
+
+def run(sizes, keyword_set_sizes, extract_sample=100, write_sample=200, queries=20, seed=42):
+    results = Results()
+    for size in sizes:
+        print(f"Corpus of {size} resumes")
+        print("-" * 40)
+        corpus = make_corpus(size, seed)
+        rng = random.Random(seed)
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            bench_extraction(results, corpus, size, tmp_dir, min(extract_sample, size))
+            bench_database(results, corpus, size, keyword_set_sizes, os.path.join(tmp_dir, "bench.db"),
+                           min(write_sample, size), queries, rng)
+        finally:
+            shutil.rmtree(tmp_dir)
+    return results
+
+
+def metadata(args):
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'seed': args.seed,
+        'sizes': args.sizes,
+        'keyword_sets': args.keyword_sets,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, matching and search on a synthetic corpus")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000],
+                        help="corpus sizes, e.g. 1000 10000 100000 (default: %(default)s)")
+    parser.add_argument("--keyword-sets", type=int, nargs="+", default=[10, 100, 500],
+                        help="keyword-set sizes (default: %(default)s)")
+    parser.add_argument("--extract-sample", type=int, default=100,
+                        help="files per format timed with extract_text (default: %(default)s)")
+    parser.add_argument("--write-sample", type=int, default=200,
+                        help="resumes inserted one at a time with add_resume (default: %(default)s)")
+    parser.add_argument("--queries", type=int, default=20, help="searches per keyword set (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.keyword_sets, args.extract_sample, args.write_sample, args.queries, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'meta': metadata(args), 'results': results.rows}, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
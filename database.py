@@ -1,20 +1,140 @@
 import sqlite3
 import os
+import re
+import threading
+import zlib
+from collections import Counter
+from metrics import metrics
+from minhash import MinHasher
+from tfidf import TfidfIndex, tfidf_supported
+
+# Words, keeping the symbols of terms like C++, C#, .NET and Node.js. A
+# leading dot must start a word, and a dot only joins words when the next
+# one starts in lowercase, so run-together sentences such as
+# "developer.Python" or "Experience...Python" still split into words.
+TOKEN_PATTERN = re.compile(r'(?:(?<![\w.])\.)?\w+(?:(?:\.(?![A-Z])|[+#])\w+)*[+#]*')
+
+
+def tokenize(text):
+    """Split text into lowercase terms for the inverted index and TF-IDF"""
+    return [term.lower() for term in TOKEN_PATTERN.findall(text)]
+
+
+def analyze_content(content):
+    """Return (term counts, MinHash signature) of resume text for add_resumes_bulk.
+
+    Needs no database, so ingestion runs it in its parse workers and the
+    writer thread only inserts the results.
+    """
+    return dict(Counter(tokenize(content))), Database.MINHASHER.signature(content)
+
+
+def compress_content(text):
+    """Compress resume text for storage as a BLOB"""
+    return zlib.compress(text.encode('utf-8'))
+
+
+def decompress_content(value):
+    """Return resume text stored either as plain TEXT or as a compressed BLOB"""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
 
 class Database:
-    def __init__(self, db_file="resume_screening.db"):
+    # Schema migrations in order; PRAGMA user_version counts how many have run
+    MIGRATIONS = (
+        "_migrate_keyword_backfills",
+        "_migrate_inverted_index",
+        "_migrate_keyword_match_indexes",
+        "_migrate_content_hash",
+        "_migrate_watched_files",
+        "_migrate_near_duplicates",
+        "_migrate_watched_file_ownership",
+        "_migrate_symbol_terms",
+    )
+    
+    # Signatures stored by one version must be comparable with the next, so
+    # changing these parameters needs a migration that recomputes them
+    MINHASHER = MinHasher(num_hashes=128, bands=16, shingle_size=5)
+    # Resumes compared per LSH bucket, newest first, so a resume stored many
+    # times over (a template, say) doesn't make every insert compare with all copies
+    BUCKET_CANDIDATES = 50
+    # Near-duplicates recorded per new resume
+    MAX_NEAR_DUPLICATES = 10
+    
+    def __init__(self, db_file="resume_screening.db", compress_content=False, busy_timeout=30.0,
+                 near_duplicate_threshold=0.8):
         # Get the directory of the current script
         script_dir = os.path.dirname(os.path.abspath(__file__))
         # Create the database file path
         self.db_path = os.path.join(script_dir, db_file)
-        # Connect to the database
-        self.conn = sqlite3.connect(self.db_path)
-        self.cursor = self.conn.cursor()
+        # Seconds a connection waits for another thread's write lock before failing
+        self.busy_timeout = busy_timeout
+        # Store new resume content zlib-compressed; rows of both kinds can coexist
+        self.compress_content = compress_content
+        # Estimated similarity at which a new resume is recorded as a near-duplicate
+        self.near_duplicate_threshold = near_duplicate_threshold
+        # In-memory TF-IDF matrix for mode "tfidf", built by enable_tfidf()
+        self.tfidf = None
+        
+        # sqlite3 connections belong to the thread that made them, so each
+        # thread using this Database gets its own, opened on first use
+        self._local = threading.local()
+        self._connections = {}  # thread -> connection, so close() can reach them all
+        self._connections_lock = threading.Lock()
+        
+        # WAL lets readers keep a consistent snapshot while another thread writes
+        self.conn.execute("PRAGMA journal_mode = WAL")
+    
+    @property
+    def conn(self):
+        """The calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+        return conn
+    
+    @property
+    def cursor(self):
+        """A cursor on the calling thread's connection, for ad-hoc queries"""
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+    
+    def _connect(self):
+        # Closed from close() on another thread, but only ever used by its own
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        # SQLite leaves foreign keys (and ON DELETE CASCADE) off by default
+        conn.execute("PRAGMA foreign_keys = ON")
+        # In WAL mode NORMAL only syncs at checkpoints and is still corruption-safe
+        conn.execute("PRAGMA synchronous = NORMAL")
+        # Lets SQL (e.g. the FTS triggers) read content whether compressed or not
+        conn.create_function("resume_text", 1, decompress_content)
+        
+        with self._connections_lock:
+            # Close connections left behind by threads that have finished
+            for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                self._connections.pop(thread).close()
+            self._connections[threading.current_thread()] = conn
+        
+        self._local.conn = conn
+        return conn
+    
+    def close(self):
+        """Close the connections of every thread"""
+        with self._connections_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
     
     def create_tables(self):
         """Create necessary tables if they don't exist"""
+        cursor = self.conn.cursor()
         # Create resumes table
-        self.cursor.execute('''
+        cursor.execute('''
         CREATE TABLE IF NOT EXISTS resumes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             filename TEXT NOT NULL,
@@ -26,7 +146,7 @@ class Database:
         ''')
         
         # Create keywords table
-        self.cursor.execute('''
+        cursor.execute('''
         CREATE TABLE IF NOT EXISTS keywords (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             keyword TEXT NOT NULL UNIQUE,
@@ -35,7 +155,7 @@ class Database:
         ''')
         
         # Create keyword_matches table
-        self.cursor.execute('''
+        cursor.execute('''
         CREATE TABLE IF NOT EXISTS keyword_matches (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             resume_id INTEGER,
@@ -47,30 +167,442 @@ class Database:
         ''')
         
         self.conn.commit()
+        
+        # Bring older databases up to the current schema
+        self.migrate()
+    
+    def migrate(self):
+        """Apply schema migrations newer than the database's PRAGMA user_version"""
+        cursor = self.conn.cursor()
+        while True:
+            # Each migration and its version bump are applied atomically. The
+            # version is read under the write lock, so when several processes
+            # open the database at once only one of them applies each step.
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("PRAGMA user_version")
+                version = cursor.fetchone()[0]
+                if version >= len(self.MIGRATIONS):
+                    self.conn.commit()
+                    return
+                getattr(self, self.MIGRATIONS[version])()
+                cursor.execute(f"PRAGMA user_version = {version + 1}")
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+    
+    def _migrate_keyword_backfills(self):
+        """Version 1: track keywords whose matches against stored resumes are pending"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS keyword_backfills (
+            keyword_id INTEGER PRIMARY KEY,
+            last_resume_id INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (keyword_id) REFERENCES keywords (id) ON DELETE CASCADE
+        )
+        ''')
+    
+    def _migrate_inverted_index(self):
+        """Version 2: term postings so searches never scan resume content"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS terms (
+            id INTEGER PRIMARY KEY,
+            term TEXT NOT NULL UNIQUE
+        )
+        ''')
+        
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS postings (
+            term_id INTEGER NOT NULL,
+            resume_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term_id, resume_id),
+            FOREIGN KEY (term_id) REFERENCES terms (id),
+            FOREIGN KEY (resume_id) REFERENCES resumes (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        ''')
+        
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_postings_resume_id ON postings (resume_id)
+        ''')
+        
+        # Index resumes stored before the inverted index existed
+        self.rebuild_index(commit=False)
+    
+    def _migrate_keyword_match_indexes(self):
+        """Version 3: index keyword_matches and make (resume_id, keyword_id) unique"""
+        cursor = self.conn.cursor()
+        # Foreign keys were never enforced, so drop matches left behind by
+        # deleted keywords and resumes
+        cursor.execute('''
+        DELETE FROM keyword_matches
+        WHERE keyword_id NOT IN (SELECT id FROM keywords)
+           OR resume_id NOT IN (SELECT id FROM resumes)
+        ''')
+        
+        # Keep only the latest match for each resume and keyword
+        cursor.execute('''
+        DELETE FROM keyword_matches
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM keyword_matches GROUP BY resume_id, keyword_id
+        )
+        ''')
+        
+        # Also serves lookups by resume_id
+        cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_keyword_matches_resume_keyword
+        ON keyword_matches (resume_id, keyword_id)
+        ''')
+        
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_keyword_matches_keyword_id
+        ON keyword_matches (keyword_id)
+        ''')
+    
+    def _migrate_content_hash(self):
+        """Version 4: store a hash of each resume file's bytes to detect re-uploads"""
+        cursor = self.conn.cursor()
+        cursor.execute("ALTER TABLE resumes ADD COLUMN content_hash TEXT")
+        
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes (content_hash)
+        ''')
+    
+    def _migrate_watched_files(self):
+        """Version 5: remember files seen in watched folders so they aren't read again"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS watched_files (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            resume_id INTEGER,
+            FOREIGN KEY (resume_id) REFERENCES resumes (id) ON DELETE SET NULL
+        )
+        ''')
     
-    def add_resume(self, filename, name, email, phone, content):
+    def _migrate_near_duplicates(self):
+        """Version 6: MinHash signatures, their LSH buckets and the near-duplicates found"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resume_signatures (
+            resume_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL,
+            FOREIGN KEY (resume_id) REFERENCES resumes (id) ON DELETE CASCADE
+        )
+        ''')
+        
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            resume_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, resume_id),
+            FOREIGN KEY (resume_id) REFERENCES resumes (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        ''')
+        
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_lsh_buckets_resume_id ON lsh_buckets (resume_id)
+        ''')
+        
+        # Each pair is stored once, against the later resume
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS near_duplicates (
+            resume_id INTEGER NOT NULL,
+            duplicate_of INTEGER NOT NULL,
+            similarity REAL NOT NULL,
+            PRIMARY KEY (resume_id, duplicate_of),
+            FOREIGN KEY (resume_id) REFERENCES resumes (id) ON DELETE CASCADE,
+            FOREIGN KEY (duplicate_of) REFERENCES resumes (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        ''')
+        
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_near_duplicates_duplicate_of ON near_duplicates (duplicate_of)
+        ''')
+        
+        # Sign resumes stored before signatures existed, oldest first
+        after_id = 0
+        while True:
+            rows = self.get_resume_contents(after_id)
+            if not rows:
+                break
+            for resume_id, content in rows:
+                self._index_signature(resume_id, self.MINHASHER.signature(content))
+            after_id = rows[-1][0]
+    
+    def _migrate_watched_file_ownership(self):
+        """Version 7: mark watched files whose resume the watcher stored itself"""
+        cursor = self.conn.cursor()
+        # Files recorded before this are treated as links, so their resumes are never deleted
+        cursor.execute("ALTER TABLE watched_files ADD COLUMN owned INTEGER NOT NULL DEFAULT 0")
+    
+    def _migrate_symbol_terms(self):
+        """Version 8: re-index resumes so terms keep symbols, e.g. c++ and .net"""
+        self.rebuild_index(commit=False)
+    
+    def add_resume(self, filename, name, email, phone, content, content_hash=None):
         """Add a new resume to the database"""
-        self.cursor.execute('''
-        INSERT INTO resumes (filename, name, email, phone, content)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (filename, name, email, phone, content))
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        INSERT INTO resumes (filename, name, email, phone, content, content_hash)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (filename, name, email, phone, self._stored_content(content), content_hash))
+        resume_id = cursor.lastrowid
+        
+        term_counts, signature = analyze_content(content)
+        self._index_resume(resume_id, term_counts)
+        self._index_signature(resume_id, signature)
         
         self.conn.commit()
-        return self.cursor.lastrowid
+        return resume_id
+    
+    def add_resumes_bulk(self, resumes, batch_size=500, commit=True):
+        """Add many (filename, name, email, phone, content[, content_hash[, analysis]]) rows in one transaction.
+
+        analysis is what analyze_content(content) returns; rows without it
+        are analyzed here. Returns the new resume IDs in input order. Pass
+        commit=False to group this with other writes and commit them together.
+        """
+        cursor = self.conn.cursor()
+        resume_ids = []
+        try:
+            for batch in self._batches(resumes, batch_size):
+                # The content hash is optional
+                rows = [tuple(resume[:4]) + (self._stored_content(resume[4]),) + (resume[5] if len(resume) > 5 else None,)
+                        for resume in batch]
+                cursor.executemany('''
+                INSERT INTO resumes (filename, name, email, phone, content, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
+                
+                # AUTOINCREMENT IDs are consecutive while we hold the write lock
+                cursor.execute("SELECT last_insert_rowid()")
+                last_id = cursor.fetchone()[0]
+                batch_ids = range(last_id - len(batch) + 1, last_id + 1)
+                
+                for resume_id, resume in zip(batch_ids, batch):
+                    term_counts, signature = resume[6] if len(resume) > 6 else analyze_content(resume[4])
+                    self._index_resume(resume_id, term_counts)
+                    self._index_signature(resume_id, signature)
+                resume_ids.extend(batch_ids)
+            
+            if commit:
+                self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        
+        return resume_ids
+    
+    def _stored_content(self, content):
+        """Convert resume text to the form it is stored in"""
+        return compress_content(content) if self.compress_content else content
+    
+    def compress_existing_content(self, batch_size=500, vacuum=True):
+        """Compress the content of resumes stored as plain text.
+
+        Runs in batches, committing after each, so it can be interrupted and
+        re-run. VACUUM afterwards returns the freed pages to the filesystem.
+        Returns the number of resumes compressed.
+        """
+        cursor = self.conn.cursor()
+        compressed = 0
+        while True:
+            cursor.execute('''
+            SELECT id, content FROM resumes
+            WHERE typeof(content) = 'text'
+            LIMIT ?
+            ''', (batch_size,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            
+            cursor.executemany('''
+            UPDATE resumes SET content = ? WHERE id = ?
+            ''', [(compress_content(content), resume_id) for resume_id, content in rows])
+            self.conn.commit()
+            compressed += len(rows)
+        
+        if vacuum and compressed:
+            cursor.execute("VACUUM")
+        return compressed
+    
+    def _index_resume(self, resume_id, term_counts):
+        """Add a resume's {term: count} postings to the inverted index (no commit)"""
+        cursor = self.conn.cursor()
+        
+        cursor.executemany('''
+        INSERT OR IGNORE INTO terms (term) VALUES (?)
+        ''', [(term,) for term in term_counts])
+        
+        cursor.executemany('''
+        INSERT OR REPLACE INTO postings (term_id, resume_id, tf)
+        SELECT id, ?, ? FROM terms WHERE term = ?
+        ''', [(resume_id, tf, term) for term, tf in term_counts.items()])
+    
+    def _index_signature(self, resume_id, signature):
+        """Store a resume's MinHash signature and record the near-duplicates it has (no commit)"""
+        if signature is None:
+            return
+        
+        cursor = self.conn.cursor()
+        band_keys = self.MINHASHER.band_keys(signature)
+        similar = sorted((pair for pair in self._similar_resumes(signature, band_keys, self.near_duplicate_threshold)
+                          if pair[0] != resume_id), key=lambda pair: (-pair[1], -pair[0]))
+        cursor.executemany('''
+        INSERT OR IGNORE INTO near_duplicates (resume_id, duplicate_of, similarity) VALUES (?, ?, ?)
+        ''', [(resume_id, other_id, similarity) for other_id, similarity in similar[:self.MAX_NEAR_DUPLICATES]])
+        
+        cursor.execute('''
+        INSERT OR REPLACE INTO resume_signatures (resume_id, signature) VALUES (?, ?)
+        ''', (resume_id, self.MINHASHER.pack(signature)))
+        cursor.executemany('''
+        INSERT OR IGNORE INTO lsh_buckets (band, bucket, resume_id) VALUES (?, ?, ?)
+        ''', [(band, key, resume_id) for band, key in enumerate(band_keys)])
+    
+    def _similar_resumes(self, signature, band_keys, threshold):
+        """[(resume_id, similarity)] of stored resumes sharing a band and at least threshold similar"""
+        cursor = self.conn.cursor()
+        # One primary-key range per band, however many resumes are stored
+        probe = '''
+            SELECT resume_id FROM (
+                SELECT resume_id FROM lsh_buckets WHERE band = ? AND bucket = ?
+                ORDER BY resume_id DESC LIMIT ?
+            )'''
+        cursor.execute(f'''
+        SELECT resume_id, signature FROM resume_signatures
+        WHERE resume_id IN ({" UNION ALL ".join([probe] * len(band_keys))})
+        ''', [value for band, key in enumerate(band_keys) for value in (band, key, self.BUCKET_CANDIDATES)])
+        
+        similar = []
+        for resume_id, packed in cursor.fetchall():
+            similarity = MinHasher.similarity(signature, self.MINHASHER.unpack(packed))
+            if similarity >= threshold:
+                similar.append((resume_id, similarity))
+        return similar
+    
+    def find_near_duplicates(self, content, threshold=None):
+        """Return [(resume_id, similarity)] of stored resumes that are near-duplicates of some text, most similar first"""
+        signature = self.MINHASHER.signature(content)
+        if signature is None:
+            return []
+        threshold = self.near_duplicate_threshold if threshold is None else threshold
+        similar = self._similar_resumes(signature, self.MINHASHER.band_keys(signature), threshold)
+        return sorted(similar, key=lambda pair: (-pair[1], pair[0]))
+    
+    def get_near_duplicates(self, resume_id):
+        """Return (resume_id, filename, name, similarity) for the recorded near-duplicates of a resume"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT r.id, r.filename, r.name, d.similarity
+        FROM (
+            SELECT duplicate_of AS other_id, similarity FROM near_duplicates WHERE resume_id = ?
+            UNION ALL
+            SELECT resume_id, similarity FROM near_duplicates WHERE duplicate_of = ?
+        ) d
+        JOIN resumes r ON r.id = d.other_id
+        ORDER BY d.similarity DESC, r.id
+        ''', (resume_id, resume_id))
+        return cursor.fetchall()
+    
+    def find_duplicate_clusters(self, threshold=None):
+        """Group every stored resume with its near-duplicates.
+
+        Only resumes sharing an LSH bucket are compared, and each only with
+        one member of every cluster already found in that bucket, so the work
+        grows with the number of resumes rather than with every pair. Returns clusters of two or more resume IDs, each sorted, largest
+        cluster first.
+        """
+        threshold = self.near_duplicate_threshold if threshold is None else threshold
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT group_concat(resume_id) FROM lsh_buckets
+        GROUP BY band, bucket
+        HAVING COUNT(*) > 1
+        ''')
+        buckets = [[int(resume_id) for resume_id in members.split(",")] for members, in cursor.fetchall()]
+        
+        signatures = {}
+        for batch in self._batches(sorted({resume_id for bucket in buckets for resume_id in bucket}), 500):
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(f"SELECT resume_id, signature FROM resume_signatures WHERE resume_id IN ({placeholders})",
+                           batch)
+            signatures.update((resume_id, self.MINHASHER.unpack(packed)) for resume_id, packed in cursor.fetchall())
+        
+        # Union-find over the candidate pairs that pass the threshold
+        parents = {}
+        
+        def root(resume_id):
+            while parents.get(resume_id, resume_id) != resume_id:
+                parents[resume_id] = parents.get(parents[resume_id], parents[resume_id])
+                resume_id = parents[resume_id]
+            return resume_id
+        
+        # Each resume is compared with one representative of each cluster
+        # already met in the bucket, so a bucket of copies costs one
+        # comparison per copy rather than one per pair
+        for bucket in buckets:
+            representatives = []
+            for resume_id in bucket:
+                cluster = root(resume_id)
+                for representative in representatives:
+                    representative = root(representative)
+                    if representative == cluster:
+                        break
+                    if MinHasher.similarity(signatures[representative], signatures[resume_id]) >= threshold:
+                        parents[cluster] = representative
+                        break
+                else:
+                    representatives.append(cluster)
+        
+        clusters = {}
+        for resume_id in signatures:
+            clusters.setdefault(root(resume_id), []).append(resume_id)
+        return sorted((sorted(members) for members in clusters.values() if len(members) > 1),
+                      key=lambda members: (-len(members), members[0]))
+    
+    def rebuild_index(self, commit=True):
+        """Rebuild the inverted index from stored resume content"""
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM postings")
+        
+        after_id = 0
+        while True:
+            rows = self.get_resume_contents(after_id)
+            if not rows:
+                break
+            for resume_id, content in rows:
+                self._index_resume(resume_id, Counter(tokenize(content)))
+            after_id = rows[-1][0]
+        
+        if commit:
+            self.conn.commit()
     
     def add_keyword(self, keyword, weight=5):
         """Add a new keyword to the database"""
+        cursor = self.conn.cursor()
         try:
-            self.cursor.execute('''
+            cursor.execute('''
             INSERT INTO keywords (keyword, weight)
             VALUES (?, ?)
             ''', (keyword, weight))
+            keyword_id = cursor.lastrowid
+            
+            # Stored resumes still need to be scored for the new keyword
+            cursor.execute('''
+            INSERT OR REPLACE INTO keyword_backfills (keyword_id, last_resume_id)
+            VALUES (?, 0)
+            ''', (keyword_id,))
             
             self.conn.commit()
-            return self.cursor.lastrowid
+            return keyword_id
         except sqlite3.IntegrityError:
             # Keyword already exists, update weight instead
-            self.cursor.execute('''
+            cursor.execute('''
             UPDATE keywords
             SET weight = ?
             WHERE keyword = ?
@@ -79,59 +611,242 @@ class Database:
             self.conn.commit()
             
             # Get the ID of the existing keyword
-            self.cursor.execute('''
+            cursor.execute('''
             SELECT id FROM keywords WHERE keyword = ?
             ''', (keyword,))
             
-            return self.cursor.fetchone()[0]
+            return cursor.fetchone()[0]
     
     def add_keyword_match(self, resume_id, keyword_id, count):
         """Add a keyword match for a resume"""
-        self.cursor.execute('''
-        INSERT INTO keyword_matches (resume_id, keyword_id, count)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        INSERT OR REPLACE INTO keyword_matches (resume_id, keyword_id, count)
         VALUES (?, ?, ?)
         ''', (resume_id, keyword_id, count))
         
         self.conn.commit()
     
+    def add_keyword_matches_bulk(self, matches, batch_size=500, commit=True):
+        """Add many (resume_id, keyword_id, count) rows in one transaction"""
+        cursor = self.conn.cursor()
+        try:
+            for batch in self._batches(matches, batch_size):
+                cursor.executemany('''
+                INSERT OR REPLACE INTO keyword_matches (resume_id, keyword_id, count)
+                VALUES (?, ?, ?)
+                ''', batch)
+            
+            if commit:
+                self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+    
+    def commit(self):
+        """Commit writes made with commit=False"""
+        self.conn.commit()
+    
+    def rollback(self):
+        """Discard writes made with commit=False"""
+        self.conn.rollback()
+    
+    @staticmethod
+    def _batches(rows, batch_size):
+        """Split an iterable of rows into lists of at most batch_size rows"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
     def get_all_resumes(self):
         """Get all resumes from the database"""
-        self.cursor.execute('''
+        cursor = self.conn.cursor()
+        cursor.execute('''
         SELECT id, filename, name, email, phone, content FROM resumes
         ORDER BY id DESC
         ''')
         
-        return self.cursor.fetchall()
+        return [row[:5] + (decompress_content(row[5]),) for row in cursor.fetchall()]
+    
+    def get_resume_summaries(self, limit=None, offset=0):
+        """Get (id, filename, name, email, phone) for resumes, newest first, without content"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, filename, name, email, phone FROM resumes
+        ORDER BY id DESC
+        LIMIT ? OFFSET ?
+        ''', (-1 if limit is None else limit, offset))
+        
+        return cursor.fetchall()
+    
+    def count_resumes(self):
+        """Get the number of stored resumes"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM resumes")
+        return cursor.fetchone()[0]
+    
+    def get_resume_summary(self, resume_id):
+        """Get (id, filename, name, email, phone) for a resume, without content"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, filename, name, email, phone FROM resumes
+        WHERE id = ?
+        ''', (resume_id,))
+        
+        return cursor.fetchone()
     
     def get_resume_by_id(self, resume_id):
         """Get a resume by its ID"""
-        self.cursor.execute('''
+        cursor = self.conn.cursor()
+        cursor.execute('''
         SELECT id, filename, name, email, phone, content FROM resumes
         WHERE id = ?
         ''', (resume_id,))
         
-        return self.cursor.fetchone()
+        row = cursor.fetchone()
+        return row and row[:5] + (decompress_content(row[5]),)
+    
+    def get_resume_ids_by_hash(self, content_hashes):
+        """Map each known content hash to the ID of a resume stored with it"""
+        cursor = self.conn.cursor()
+        resume_ids = {}
+        for batch in self._batches(set(content_hashes), 500):
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(f'''
+            SELECT content_hash, MIN(id) FROM resumes
+            WHERE content_hash IN ({placeholders})
+            GROUP BY content_hash
+            ''', batch)
+            resume_ids.update(cursor.fetchall())
+        
+        return resume_ids
+    
+    def get_watched_files(self, directory):
+        """Map each recorded path under directory to (mtime_ns, size, resume_id, owned)"""
+        cursor = self.conn.cursor()
+        prefix = os.path.join(directory, '')
+        # Range scan on the primary key instead of LIKE, which can't use it
+        cursor.execute('''
+        SELECT path, mtime_ns, size, resume_id, owned FROM watched_files
+        WHERE path >= ? AND path < ?
+        ''', (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+        
+        return {path: (mtime_ns, size, resume_id, bool(owned))
+                for path, mtime_ns, size, resume_id, owned in cursor.fetchall()}
+    
+    def save_watched_files(self, files):
+        """Record (path, mtime_ns, size, resume_id, owned) rows for watched files.
+
+        owned is true when the file's resume was stored from it, rather than
+        the file being linked to an existing resume with the same bytes.
+        """
+        cursor = self.conn.cursor()
+        cursor.executemany('''
+        INSERT OR REPLACE INTO watched_files (path, mtime_ns, size, resume_id, owned)
+        VALUES (?, ?, ?, ?, ?)
+        ''', files)
+        
+        self.conn.commit()
+    
+    def delete_watched_files(self, paths):
+        """Forget watched files that have been removed"""
+        cursor = self.conn.cursor()
+        cursor.executemany('''
+        DELETE FROM watched_files WHERE path = ?
+        ''', [(path,) for path in paths])
+        
+        self.conn.commit()
     
     def get_all_keywords(self):
         """Get all keywords from the database"""
-        self.cursor.execute('''
+        cursor = self.conn.cursor()
+        cursor.execute('''
         SELECT id, keyword, weight FROM keywords
         ORDER BY keyword
         ''')
         
-        return self.cursor.fetchall()
+        return cursor.fetchall()
     
     def delete_keyword(self, keyword_id):
         """Delete a keyword from the database"""
-        self.cursor.execute('''
+        cursor = self.conn.cursor()
+        cursor.execute('''
         DELETE FROM keywords WHERE id = ?
         ''', (keyword_id,))
+        cursor.execute('''
+        DELETE FROM keyword_backfills WHERE keyword_id = ?
+        ''', (keyword_id,))
+        
+        self.conn.commit()
+    
+    def get_pending_backfills(self):
+        """Get (keyword_id, keyword, weight, last_resume_id) for unfinished keyword backfills"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT k.id, k.keyword, k.weight, b.last_resume_id
+        FROM keyword_backfills b
+        JOIN keywords k ON b.keyword_id = k.id
+        ORDER BY k.id
+        ''')
+        
+        return cursor.fetchall()
+    
+    def get_resume_contents(self, after_id=0, limit=500):
+        """Get the next (id, content) rows after a resume ID, in ID order"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, content FROM resumes
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+        ''', (after_id, limit))
+        
+        return [(resume_id, decompress_content(content)) for resume_id, content in cursor.fetchall()]
+    
+    def save_backfill_batch(self, keyword_ids, first_resume_id, last_resume_id, matches):
+        """Replace the matches of keyword_ids for a range of resumes and record progress.
+
+        Replacing rather than appending makes re-running an interrupted batch safe.
+        """
+        cursor = self.conn.cursor()
+        try:
+            placeholders = ", ".join("?" * len(keyword_ids))
+            cursor.execute(f'''
+            DELETE FROM keyword_matches
+            WHERE keyword_id IN ({placeholders}) AND resume_id BETWEEN ? AND ?
+            ''', (*keyword_ids, first_resume_id, last_resume_id))
+            
+            self.add_keyword_matches_bulk(matches, commit=False)
+            
+            cursor.execute(f'''
+            UPDATE keyword_backfills
+            SET last_resume_id = MAX(last_resume_id, ?)
+            WHERE keyword_id IN ({placeholders})
+            ''', (last_resume_id, *keyword_ids))
+            
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+    
+    def finish_backfills(self, keyword_ids):
+        """Mark keyword backfills as complete"""
+        cursor = self.conn.cursor()
+        cursor.executemany('''
+        DELETE FROM keyword_backfills WHERE keyword_id = ?
+        ''', [(keyword_id,) for keyword_id in keyword_ids])
         
         self.conn.commit()
     
     def get_keyword_matches(self, resume_id):
         """Get all keyword matches for a resume"""
-        self.cursor.execute('''
+        cursor = self.conn.cursor()
+        cursor.execute('''
         SELECT k.keyword, km.count, k.weight
         FROM keyword_matches km
         JOIN keywords k ON km.keyword_id = k.id
@@ -139,52 +854,283 @@ class Database:
         ORDER BY km.count * k.weight DESC
         ''', (resume_id,))
         
-        return self.cursor.fetchall()
+        return cursor.fetchall()
     
-    def search_resumes(self, keywords):
-        """Search resumes by keywords and return ranked results"""
-        if not keywords:
+    def search_resumes(self, keywords, mode="index"):
+        """Search resumes by keywords and return ranked results.
+
+        mode "index" ranks by weighted keyword matches; mode "fts" ranks by
+        BM25 relevance using the FTS5 index (see enable_fts); mode "tfidf"
+        ranks by TF-IDF cosine similarity (see enable_tfidf).
+        """
+        if mode == "tfidf":
+            with metrics.timer("search", {'keywords': list(keywords), 'mode': mode}):
+                return self._tfidf_rows(self._tfidf_search(keywords))
+        
+        cursor = self.conn.cursor()
+        scored = self._scored_query(keywords, mode)
+        if scored is None:
             return []
         
-        # Build query to calculate score based on keyword matches
-        query = '''
+        query, params = scored
+        with metrics.timer("search", {'keywords': list(keywords), 'mode': mode}):
+            cursor.execute(f"SELECT id, name, email, phone, score FROM ({query}) ORDER BY score DESC, id DESC", params)
+            return cursor.fetchall()
+    
+    def search_resumes_page(self, keywords, limit=50, after=None, mode="index"):
+        """Return the top `limit` results ranked after the (score, id) cursor `after`.
+
+        Returns (results, next_cursor); next_cursor is None on the last page.
+        Only one page is sorted out and returned, however many resumes match.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        if mode == "tfidf":
+            with metrics.timer("search", {'keywords': list(keywords), 'mode': mode, 'after': after}):
+                ranked = self._tfidf_search(keywords, limit, after)
+                results = self._tfidf_rows(ranked)
+            next_cursor = None
+            if len(ranked) == limit:
+                next_cursor = (ranked[-1][1], ranked[-1][0])
+            return results, next_cursor
+        
+        cursor = self.conn.cursor()
+        scored = self._scored_query(keywords, mode)
+        if scored is None:
+            return [], None
+        
+        query, params = scored
+        query = f"SELECT id, name, email, phone, score FROM ({query})"
+        params = list(params)
+        if after is not None:
+            # Keyset pagination: continue strictly below the last row returned
+            score, resume_id = after
+            query += " WHERE score < ? OR (score = ? AND id < ?)"
+            params.extend([score, score, resume_id])
+        query += " ORDER BY score DESC, id DESC LIMIT ?"
+        params.append(limit)
+        
+        with metrics.timer("search", {'keywords': list(keywords), 'mode': mode, 'after': after}):
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+        
+        next_cursor = None
+        if len(results) == limit:
+            next_cursor = (results[-1][4], results[-1][0])
+        return results, next_cursor
+    
+    def _scored_query(self, keywords, mode):
+        """Build the unordered (query, params) scoring every matching resume, or None"""
+        if not keywords:
+            return None
+        
+        if mode == "fts":
+            return self._scored_fts_query(keywords)
+        elif mode != "index":
+            raise ValueError(f"Unknown search mode: {mode}")
+        
+        # Each keyword selects the resumes containing all of its terms; the
+        # candidates are the union of those sets, resolved from the postings
+        candidate_queries = []
+        params = []
+        for keyword in keywords:
+            terms = sorted(set(tokenize(keyword)))
+            if not terms:
+                continue
+            placeholders = ", ".join("?" * len(terms))
+            candidate_queries.append(f'''
+            SELECT p.resume_id
+            FROM postings p
+            JOIN terms t ON p.term_id = t.id
+            WHERE t.term IN ({placeholders})
+            GROUP BY p.resume_id
+            HAVING COUNT(*) = ?
+            ''')
+            params.extend(terms)
+            params.append(len(terms))
+        
+        if not candidate_queries:
+            return None
+        
+        # Score candidates based on keyword matches
+        query = f'''
+        WITH candidates (resume_id) AS ({" UNION ".join(candidate_queries)})
         SELECT r.id, r.name, r.email, r.phone,
                SUM(CASE WHEN k.keyword IS NULL THEN 0 ELSE km.count * k.weight END) as score
-        FROM resumes r
+        FROM candidates c
+        JOIN resumes r ON r.id = c.resume_id
         LEFT JOIN keyword_matches km ON r.id = km.resume_id
         LEFT JOIN keywords k ON km.keyword_id = k.id
-        '''        
-        
-        # Add content search for keywords not in the keywords table
-        content_conditions = []
-        for keyword in keywords:
-            content_conditions.append(f"r.content LIKE '%{keyword}%'")
+        GROUP BY r.id
+        '''
         
-        if content_conditions:
-            query += " WHERE " + " OR ".join(content_conditions)
+        return query, params
+    
+    def _scored_fts_query(self, keywords):
+        """Build the FTS5 query ranking by BM25 relevance, or None"""
+        # Each keyword is matched as a quoted phrase; any of them may match
+        phrases = ['"' + keyword.replace('"', '""') + '"' for keyword in keywords if tokenize(keyword)]
+        if not phrases:
+            return None
         
-        query += '''
-        GROUP BY r.id
-        ORDER BY score DESC
+        # bm25() is lower for better matches, so negate it for a descending score
+        query = '''
+        SELECT r.id, r.name, r.email, r.phone, -bm25(resumes_fts) as score
+        FROM resumes_fts
+        JOIN resumes r ON r.id = resumes_fts.rowid
+        WHERE resumes_fts MATCH ?
         '''
         
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        return query, [" OR ".join(phrases)]
+    
+    def _tfidf_search(self, keywords, limit=None, after=None):
+        """Rank with the TF-IDF index, returning [(resume_id, score)]"""
+        if self.tfidf is None:
+            raise ValueError("TF-IDF ranking is not enabled for this database")
+        return self.tfidf.search(tokenize(" ".join(keywords)), limit, after)
+    
+    def _tfidf_rows(self, ranked):
+        """Fetch (id, name, email, phone, score) rows for ranked (resume_id, score) pairs"""
+        cursor = self.conn.cursor()
+        summaries = {}
+        for batch in self._batches([resume_id for resume_id, _ in ranked], 500):
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(f"SELECT id, name, email, phone FROM resumes WHERE id IN ({placeholders})", batch)
+            summaries.update((row[0], row) for row in cursor.fetchall())
+        
+        results = []
+        for resume_id, score in ranked:
+            if resume_id in summaries:
+                results.append(summaries[resume_id] + (score,))
+            else:
+                # Deleted through another Database or process since it was indexed
+                self.tfidf.remove(resume_id)
+        return results
+    
+    def match_job_description(self, text, limit=10, explain=10):
+        """Rank every resume against a pasted job description by TF-IDF cosine similarity.
+
+        Returns the top `limit` (id, name, email, phone, score, terms) rows,
+        where terms lists the (term, contribution) pairs that scored most.
+        """
+        if self.tfidf is None:
+            raise ValueError("TF-IDF ranking is not enabled for this database")
+        with metrics.timer("search", {'keywords': [text[:80]], 'mode': "job_description"}):
+            ranked = self.tfidf.match(tokenize(text), limit, explain)
+            terms = {resume_id: contributions for resume_id, _, contributions in ranked}
+            rows = self._tfidf_rows([(resume_id, score) for resume_id, score, _ in ranked])
+        return [row + (terms[row[0]],) for row in rows]
+    
+    @staticmethod
+    def tfidf_supported():
+        """Check whether NumPy and SciPy are installed for TF-IDF ranking"""
+        return tfidf_supported()
+    
+    def enable_tfidf(self, cache_file=None):
+        """Build the in-memory TF-IDF matrix used by mode "tfidf" and job-description matching.
+
+        The matrix is loaded from the postings table by the first TF-IDF
+        search and then follows new resumes on each search, so call this
+        once at start-up. With a cache_file, tfidf.save() persists it and
+        the next start-up only reads postings added since.
+        """
+        if self.tfidf is None:
+            self.tfidf = TfidfIndex(self, cache_file=cache_file)
+        return self.tfidf
+    
+    @staticmethod
+    def fts5_supported():
+        """Check whether this SQLite build includes the FTS5 extension"""
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE fts5_check USING fts5(content)")
+            return True
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            conn.close()
+    
+    def has_fts(self):
+        """Check whether the FTS5 index has been enabled for this database"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumes_fts'")
+        return cursor.fetchone() is not None
+    
+    def enable_fts(self):
+        """Create an FTS5 index over resume text, kept in sync by triggers.
+
+        The index is contentless and fed through resume_text(), so it works
+        with compressed content. Safe to call on every start-up; the first
+        call on an existing database indexes every stored resume.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'resumes_fts'")
+        row = cursor.fetchone()
+        if row is not None and "content=''" not in row[0]:
+            # Replace the earlier external-content index, which read resumes.content directly
+            for trigger in ("resumes_fts_insert", "resumes_fts_delete", "resumes_fts_update"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute("DROP TABLE resumes_fts")
+            row = None
+        
+        cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts
+        USING fts5(content, content='')
+        ''')
+        
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes BEGIN
+            INSERT INTO resumes_fts (rowid, content) VALUES (new.id, resume_text(new.content));
+        END
+        ''')
+        
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes BEGIN
+            INSERT INTO resumes_fts (resumes_fts, rowid, content)
+            VALUES ('delete', old.id, resume_text(old.content));
+        END
+        ''')
+        
+        # Compressing a row leaves its text unchanged, so only reindex real edits
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS resumes_fts_update AFTER UPDATE OF content ON resumes
+        WHEN resume_text(old.content) IS NOT resume_text(new.content) BEGIN
+            INSERT INTO resumes_fts (resumes_fts, rowid, content)
+            VALUES ('delete', old.id, resume_text(old.content));
+            INSERT INTO resumes_fts (rowid, content) VALUES (new.id, resume_text(new.content));
+        END
+        ''')
+        
+        # Backfill the index for resumes stored before it existed
+        if row is None:
+            cursor.execute('''
+            INSERT INTO resumes_fts (rowid, content)
+            SELECT id, resume_text(content) FROM resumes
+            ''')
+        
+        self.conn.commit()
     
     def delete_resume(self, resume_id):
         """Delete a resume and its keyword matches from the database"""
+        cursor = self.conn.cursor()
         try:
             # First delete keyword matches
-            self.cursor.execute("DELETE FROM keyword_matches WHERE resume_id = ?", (resume_id,))
+            cursor.execute("DELETE FROM keyword_matches WHERE resume_id = ?", (resume_id,))
+            cursor.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+            cursor.execute("DELETE FROM lsh_buckets WHERE resume_id = ?", (resume_id,))
+            cursor.execute("DELETE FROM resume_signatures WHERE resume_id = ?", (resume_id,))
+            cursor.execute("DELETE FROM near_duplicates WHERE resume_id = ? OR duplicate_of = ?", (resume_id, resume_id))
             # Then delete the resume
-            self.cursor.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
+            cursor.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
             self.conn.commit()
+            if self.tfidf is not None:
+                self.tfidf.remove(resume_id)
             return True
         except sqlite3.Error as e:
             print(f"Error deleting resume: {e}")
             return False
     
     def __del__(self):
-        """Close the database connection when the object is destroyed"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
\ No newline at end of file
+        """Close the database connections when the object is destroyed"""
+        if hasattr(self, '_connections'):
+            self.close()
\ No newline at end of file
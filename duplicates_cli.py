@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import sys
+import time
+from database import Database
+
+# Report clusters of near-duplicate resumes across the whole database
+#
+#   python duplicates_cli.py [--db FILE] [--threshold 0.8] [--json]
+#
+# Resumes are compared through their MinHash signatures and LSH buckets
+# (see minhash.py), so only resumes sharing a bucket are ever compared.
+
+
+def describe_clusters(db, clusters, out=sys.stdout):
+    for number, cluster in enumerate(clusters, start=1):
+        print(f"Cluster {number}: {len(cluster)} resumes", file=out)
+        for resume_id in cluster:
+            summary = db.get_resume_summary(resume_id)
+            if summary is not None:
+                _, filename, name, email, _ = summary
+                print(f"  #{resume_id:<8} {filename}  {name}  {email}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find clusters of near-duplicate resumes")
+    parser.add_argument("--db", default="resume_screening.db", help="database file (default: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=0.8,
+                        help="estimated similarity from 0 to 1 that counts as a duplicate (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print the clusters of resume IDs as JSON")
+    args = parser.parse_args(argv)
+
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be above 0 and at most 1")
+
+    db = Database(os.path.abspath(args.db))
+    try:
+        db.create_tables()
+        start = time.perf_counter()
+        clusters = db.find_duplicate_clusters(args.threshold)
+        elapsed = time.perf_counter() - start
+
+        if args.json:
+            print(json.dumps({'threshold': args.threshold, 'clusters': clusters}))
+        else:
+            describe_clusters(db, clusters, sys.stdout)
+            print(f"{len(clusters)} cluster(s), {sum(len(cluster) for cluster in clusters)} resumes, "
+                  f"found in {elapsed:.2f}s")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
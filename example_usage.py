@@ -58,15 +58,6 @@ def example_usage():
     - Created visualizations and reports for stakeholders
     """
     
-    resume1_id = db.add_resume(
-        "john_smith_resume.pdf",
-        "John Smith",
-        "john.smith@example.com",
-        "(123) 456-7890",
-        resume1_content
-    )
-    print(f"  Added: John Smith's resume")
-    
     # Example resume 2
     resume2_content = """
     Jane Doe
@@ -95,13 +86,12 @@ def example_usage():
     - Worked with various CMS platforms
     """
     
-    resume2_id = db.add_resume(
-        "jane_doe_resume.pdf",
-        "Jane Doe",
-        "jane.doe@example.com",
-        "(987) 654-3210",
-        resume2_content
-    )
+    # Insert both resumes in a single transaction
+    resume1_id, resume2_id = db.add_resumes_bulk([
+        ("john_smith_resume.pdf", "John Smith", "john.smith@example.com", "(123) 456-7890", resume1_content),
+        ("jane_doe_resume.pdf", "Jane Doe", "jane.doe@example.com", "(987) 654-3210", resume2_content),
+    ])
+    print(f"  Added: John Smith's resume")
     print(f"  Added: Jane Doe's resume")
     
     # Process keywords for the resumes
@@ -110,12 +100,14 @@ def example_usage():
     # Get all keywords
     all_keywords = db.get_all_keywords()
     
+    matches = []
+    
     # Process resume 1
     for keyword_id, keyword, weight in all_keywords:
         # Count occurrences (case insensitive)
         count = resume1_content.lower().count(keyword.lower())
         if count > 0:
-            db.add_keyword_match(resume1_id, keyword_id, count)
+            matches.append((resume1_id, keyword_id, count))
             print(f"  John Smith's resume: '{keyword}' found {count} times")
     
     # Process resume 2
@@ -123,9 +115,12 @@ def example_usage():
         # Count occurrences (case insensitive)
         count = resume2_content.lower().count(keyword.lower())
         if count > 0:
-            db.add_keyword_match(resume2_id, keyword_id, count)
+            matches.append((resume2_id, keyword_id, count))
             print(f"  Jane Doe's resume: '{keyword}' found {count} times")
     
+    # Commit all matches at once
+    db.add_keyword_matches_bulk(matches)
+    
     # Search examples
     print("\nSearch Examples:")
     
@@ -0,0 +1,69 @@
+import re
+
+# Regexes for the fields found by pattern. A field may list several; the
+# leftmost match in the text wins, and the earlier pattern on a tie.
+DEFAULT_FIELDS = {
+    # The lookbehind skips starts inside a word; the leftmost match is the same
+    'email': r'(?<![\w\.-])[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}',
+    # +1 123-456-7890, (123) 456-7890 or 123-456-7890, longest format first.
+    # Kept apart: one alternation defeats the regex engine's literal prefix
+    # scan and searches slower than the three patterns do one after another.
+    'phone': (r'\+\d{1,2}[-. ]?\d{3}[-. ]?\d{3}[-. ]?\d{4}',
+              r'\(\d{3}\)[-. ]?\d{3}[-.]?\d{4}',
+              r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+}
+
+LINKEDIN_PATTERN = r'(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[\w%-]+/?'
+
+_SYMBOLS_ONLY = re.compile(r'[\W_]+')
+_NOT_A_NAME = re.compile(r'@|http|www|\.com', re.IGNORECASE)
+_CAPITALIZED_NAME = re.compile(r'([A-Z][a-z]+ [A-Z][a-z]+)')
+
+
+class FieldExtractor:
+    """Pull candidate fields from the head of a resume.
+
+    Only the first head_chars characters are searched: contact details sit
+    at the top, and the cap keeps long resumes from costing more. The name
+    is the first of the opening lines that looks like one, falling back to
+    the first pair of capitalized words. Every other field is one regex or
+    a tuple of them, compiled once. Pass extra fields such as
+    {'linkedin': LINKEDIN_PATTERN} to find more.
+    """
+
+    def __init__(self, fields=None, head_chars=5000, name_lines=10):
+        fields = dict(DEFAULT_FIELDS, **(fields or {}))
+        self.fields = {name: [re.compile(pattern) for pattern in
+                              ((patterns,) if isinstance(patterns, str) else patterns)]
+                       for name, patterns in fields.items()}
+        self.head_chars = head_chars
+        self.name_lines = name_lines
+
+    def extract(self, text):
+        """Return a dict of field values, "Unknown" for fields not found"""
+        head = text[:self.head_chars]
+        values = {'name': self.extract_name(head)}
+        for name, patterns in self.fields.items():
+            found = None
+            for pattern in patterns:
+                match = pattern.search(head)
+                if match is not None and (found is None or match.start() < found.start()):
+                    found = match
+            values[name] = found.group() if found is not None else "Unknown"
+        return values
+
+    def extract_name(self, head):
+        # Only the opening lines are split off, not the whole head
+        start = 0
+        for _ in range(self.name_lines):
+            end = head.find('\n', start)
+            line = head[start:end if end != -1 else len(head)].strip()
+            if (line and not _SYMBOLS_ONLY.fullmatch(line)
+                    and len(line) < 50 and not _NOT_A_NAME.search(line)):
+                return line
+            if end == -1:
+                break
+            start = end + 1
+
+        name_match = _CAPITALIZED_NAME.search(head)
+        return name_match.group(1) if name_match else "Unknown"
@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import sys
+import time
+from database import Database
+from ingestion import IngestionEngine, RESUME_EXTENSIONS, find_resumes
+from metrics import metrics
+from watcher import DropFolderWatcher
+
+# Headless bulk ingestion of a directory tree
+#
+#   python ingest_cli.py RESUME_DIR [--db FILE] [--journal FILE] [--workers N]
+#   python ingest_cli.py RESUME_DIR --watch [--interval SECONDS]
+#
+# Every file handled is appended to a journal once its batch is committed,
+# so re-running the same command after an interruption skips those files.
+# With --watch the directory is polled instead, ingesting new and changed
+# files as they appear until interrupted.
+
+
+class IngestJournal:
+    """Append-only JSON lines record of the files an ingest run has handled"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Return the set of paths already handled, leaving out failed ones so they are retried"""
+        done = set()
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                    if entry.get('error') is None:
+                        done.add(entry['path'])
+                except (ValueError, KeyError, AttributeError):
+                    # A line cut short by a crash; its file is simply redone
+                    continue
+        return done
+
+    def record(self, report):
+        """Append (path, resume_id, error, duplicate) entries and flush them to disk"""
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for path, resume_id, error, duplicate in report:
+                file.write(json.dumps({'path': path, 'resume_id': resume_id,
+                                       'error': error, 'duplicate': duplicate}) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class IngestStats:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.files = 0
+        self.ingested = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.bytes = 0
+        self.skipped = 0  # already in the journal
+
+    def add(self, report):
+        for path, resume_id, error, duplicate in report:
+            self.files += 1
+            if error is not None:
+                self.failed += 1
+            elif duplicate:
+                self.duplicates += 1
+            else:
+                self.ingested += 1
+            try:
+                self.bytes += os.path.getsize(path)
+            except OSError:
+                pass
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.files / elapsed if elapsed else 0.0
+        mb_rate = self.bytes / (1024 * 1024) / elapsed if elapsed else 0.0
+        return "\n".join([
+            f"Files handled:  {self.files} ({self.skipped} skipped from journal)",
+            f"  ingested:     {self.ingested}",
+            f"  duplicates:   {self.duplicates}",
+            f"  failed:       {self.failed}",
+            f"Elapsed:        {elapsed:.1f}s",
+            f"Throughput:     {rate:.1f} files/s, {mb_rate:.2f} MB/s",
+        ])
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def ingest_directory(engine, directory, journal, chunk_size=1000, extensions=RESUME_EXTENSIONS, out=sys.stdout):
+    """Ingest every resume under directory not yet in the journal; returns IngestStats"""
+    stats = IngestStats()
+    done = journal.load()
+
+    paths = []
+    for path in find_resumes(directory, extensions):
+        path = os.path.abspath(path)
+        if path in done:
+            stats.skipped += 1
+        else:
+            paths.append(path)
+    print(f"Found {len(paths)} resumes to ingest ({stats.skipped} already done)", file=out)
+
+    for chunk in chunks(paths, chunk_size):
+        report = engine.ingest(chunk)
+        journal.record(report)
+        stats.add(report)
+        for path, _, error, _ in report:
+            if error is not None:
+                print(f"  failed: {path}: {error}", file=out)
+        print(f"  {stats.files}/{len(paths)} files", file=out)
+
+    # Keywords added during the run still need scoring against stored resumes
+    engine.backfill_keywords()
+    return stats
+
+
+def watch_directory(engine, directory, interval, out=sys.stdout):
+    """Ingest new and changed files under directory until interrupted"""
+    def on_report(report):
+        stats = IngestStats()
+        stats.add(report)
+        print(f"{time.strftime('%H:%M:%S')} ingested {stats.ingested}, duplicates {stats.duplicates}, "
+              f"failed {stats.failed}", file=out)
+        for path, _, error, _ in report:
+            if error is not None:
+                print(f"  failed: {path}: {error}", file=out)
+
+    print(f"Watching {directory} every {interval}s (Ctrl+C to stop)", file=out)
+    DropFolderWatcher(engine, directory, interval=interval).run(on_report=on_report)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest a directory tree of resumes without the GUI")
+    parser.add_argument("directory", help="directory searched recursively for resumes")
+    parser.add_argument("--db", default="resume_screening.db", help="database file (default: %(default)s)")
+    parser.add_argument("--journal", help="checkpoint journal (default: <db>.journal)")
+    parser.add_argument("--workers", type=int, help="parser processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="files per checkpoint (default: %(default)s)")
+    parser.add_argument("--compress", action="store_true",
+                        help="store resume text compressed, compressing resumes already stored as plain text first")
+    parser.add_argument("--extraction-cache", metavar="DIR",
+                        help="keep extracted text in DIR, so re-ingesting the same files skips parsing")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="record per-stage timings and write them to FILE as JSON")
+    parser.add_argument("--watch", action="store_true", help="keep polling the directory for new files")
+    parser.add_argument("--interval", type=float, default=5.0,
+                        help="seconds between polls with --watch (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    if args.metrics:
+        metrics.enable()
+
+    db = Database(os.path.abspath(args.db), compress_content=args.compress)
+    db.create_tables()
+    if Database.fts5_supported():
+        db.enable_fts()
+    if args.compress:
+        compressed = db.compress_existing_content()
+        if compressed:
+            print(f"Compressed {compressed} stored resume(s)")
+
+    journal = IngestJournal(args.journal or db.db_path + ".journal")
+    engine = IngestionEngine(db, args.workers, cache_dir=args.extraction_cache)
+    try:
+        if args.watch:
+            watch_directory(engine, args.directory, args.interval)
+            return 0
+        stats = ingest_directory(engine, args.directory, journal, args.chunk_size)
+    except KeyboardInterrupt:
+        if args.watch:
+            return 0
+        print(f"Interrupted; re-run the same command to resume from {journal.path}", file=sys.stderr)
+        return 130
+    finally:
+        engine.close()
+        db.close()
+        if args.metrics:
+            with open(args.metrics, 'w', encoding='utf-8') as file:
+                file.write(metrics.to_json(indent=2))
+
+    print(stats.summary())
+    if args.metrics:
+        print()
+        print(metrics.format_table())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
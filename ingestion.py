@@ -0,0 +1,460 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import PyPDF2
+import docx2txt
+from database import analyze_content
+from field_extractor import FieldExtractor
+from keyword_matcher import KeywordMatcher, keyword_set_key
+from metrics import metrics
+from writer import GroupCommitWriter
+
+
+# File types extract_text can read
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.doc', '.txt')
+
+# Caps applied when ingesting, so an oversized "resume" can't stall a batch
+MAX_PAGES = 100
+MAX_CHARS = 500000
+# Contact details are looked for in this much of the start of a resume
+CONTACT_HEAD_CHARS = 5000
+CONTACT_EXTRACTOR = FieldExtractor(head_chars=CONTACT_HEAD_CHARS)
+
+
+def extract_text(filename, max_pages=None, max_chars=None):
+    """Extract plain text from a PDF, DOCX or TXT resume, optionally capped"""
+    file_ext = os.path.splitext(filename)[1].lower()
+
+    if file_ext == '.pdf':
+        return extract_text_from_pdf(filename, max_pages, max_chars)
+    elif file_ext in ['.docx', '.doc']:
+        return _truncate(extract_text_from_docx(filename), max_chars)
+    elif file_ext == '.txt':
+        with open(filename, 'r', encoding='utf-8', errors='ignore') as file:
+            return file.read(-1 if max_chars is None else max_chars)
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
+
+
+def find_resumes(directory, extensions=RESUME_EXTENSIONS):
+    """Yield the paths of resume files under a directory tree, in a stable order"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+            if os.path.splitext(filename)[1].lower() in extensions:
+                yield os.path.join(root, filename)
+
+
+def iter_pdf_pages(filename, max_pages=None):
+    """Yield the text of a PDF one page at a time"""
+    with open(filename, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for number, page in enumerate(pdf_reader.pages):
+            if max_pages is not None and number >= max_pages:
+                return
+            yield page.extract_text() or ""
+
+
+def extract_text_from_pdf(filename, max_pages=None, max_chars=None):
+    # Collect pages and join once rather than growing one string per page
+    pieces = []
+    length = 0
+    for page_text in iter_pdf_pages(filename, max_pages):
+        pieces.append(page_text + "\n")
+        length += len(pieces[-1])
+        if max_chars is not None and length >= max_chars:
+            break
+    return _truncate("".join(pieces), max_chars)
+
+
+def extract_text_from_docx(filename):
+    return docx2txt.process(filename)
+
+
+def _truncate(text, max_chars):
+    return text if max_chars is None else text[:max_chars]
+
+
+def extract_contact_fields(text):
+    """Return (name, email, phone) found in the head of the text"""
+    fields = CONTACT_EXTRACTOR.extract(text)
+    return fields['name'], fields['email'], fields['phone']
+
+
+def count_keywords(text, keywords):
+    """Count occurrences of each (keyword_id, keyword, weight) in text"""
+    return get_matcher(keywords).count(text)
+
+
+_matcher = None
+
+
+def get_matcher(keywords):
+    """Return a KeywordMatcher for keywords, rebuilding it only when the set changes"""
+    global _matcher
+    if _matcher is None or _matcher.key != keyword_set_key(keywords):
+        _matcher = KeywordMatcher(keywords)
+    return _matcher
+
+
+def file_hash(filename):
+    """SHA-256 hex digest of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """On-disk cache of extracted resume text, keyed by file content hash.
+
+    Entries are plain text and outlive the resumes they came from, so the
+    cache is bounded: prune() keeps the max_entries most recently used.
+    """
+
+    def __init__(self, directory, max_entries=None):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def path(self, content_hash):
+        return os.path.join(self.directory, content_hash[:2], content_hash + '.txt')
+
+    def get(self, content_hash):
+        """Return the cached text for a hash, or None"""
+        try:
+            path = self.path(content_hash)
+            with open(path, 'r', encoding='utf-8') as file:
+                text = file.read()
+        except FileNotFoundError:
+            return None
+        # The modification time doubles as the last use, for prune()
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return text
+
+    def put(self, content_hash, text):
+        path = self.path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename so concurrent readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        os.replace(temp_path, path)
+
+    def prune(self):
+        """Delete the least recently used entries beyond max_entries; returns how many went"""
+        if self.max_entries is None:
+            return 0
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.txt'):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.stat(path).st_mtime_ns, path))
+                    except FileNotFoundError:
+                        continue
+        if len(entries) <= self.max_entries:
+            return 0
+        entries.sort()
+        removed = 0
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+def parse_resume(filename, content_hash=None, cache_dir=None):
+    """Extract text and candidate fields from a resume file.
+
+    Returns (filename, name, email, phone, text, content_hash, analysis),
+    analysis being database.analyze_content(text) for the writer. With a
+    cache_dir, text extracted from identical bytes before is reused instead
+    of parsing the file again. Runs inside worker processes, so it only takes
+    and returns picklable values.
+    """
+    if content_hash is None:
+        content_hash = file_hash(filename)
+
+    cache = ExtractionCache(cache_dir) if cache_dir else None
+    text = cache.get(content_hash) if cache else None
+    if text is None:
+        with metrics.timer("extract"):
+            text = extract_text(filename, MAX_PAGES, MAX_CHARS)
+        if cache:
+            cache.put(content_hash, text)
+            metrics.count("extraction_cache_misses")
+    else:
+        metrics.count("extraction_cache_hits")
+
+    with metrics.timer("parse_fields"):
+        name, email, phone = extract_contact_fields(text)
+    # Terms and MinHash signature too, so the writer thread only inserts
+    with metrics.timer("analyze"):
+        analysis = analyze_content(text)
+    return (os.path.basename(filename), name, email, phone, text, content_hash, analysis)
+
+
+def _init_worker():
+    """Start a worker process with empty metrics.
+
+    Forked workers inherit the parent's totals (and possibly a held lock),
+    which take() would otherwise hand back to be merged a second time.
+    """
+    metrics.lock = threading.Lock()
+    metrics.reset()
+
+
+def _parse_resume_with_metrics(filename, content_hash=None, cache_dir=None):
+    """parse_resume in a worker process, also returning the metrics it recorded"""
+    metrics.enable()
+    parsed = parse_resume(filename, content_hash, cache_dir)
+    return parsed, metrics.take()
+
+
+class IngestionEngine:
+    def __init__(self, db, workers=None, batch_size=100, backfill_batch_size=500, cache_dir=None,
+                 cache_size=10000, commit_delay=0.05, max_queue=1000):
+        self.db = db
+        # Default to one worker per core
+        self.workers = workers or os.cpu_count() or 1
+        # Up to batch_size parsed resumes are written per transaction, waiting
+        # at most commit_delay seconds to fill a batch
+        self.batch_size = batch_size
+        self.commit_delay = commit_delay
+        # Parsed resumes queued for writing before producers have to wait
+        self.max_queue = max_queue
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        # Number of stored resumes scanned per backfill transaction
+        self.backfill_batch_size = backfill_batch_size
+        # Optional cache of extracted text, holding at most cache_size files
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+
+    def process_keywords(self, resume_id, text):
+        """Store keyword matches for a resume"""
+        keywords = self.db.get_all_keywords()
+
+        with metrics.timer("match"):
+            matches = [(resume_id, keyword_id, count) for keyword_id, count in count_keywords(text, keywords)]
+        with metrics.timer("write"):
+            self.db.add_keyword_matches_bulk(matches)
+        metrics.count("keyword_matches_written", len(matches))
+
+    def save_batch(self, parsed_batch):
+        """Persist parsed resumes and their keyword matches in one transaction.
+
+        Returns the new resume IDs in input order.
+        """
+        keywords = self.db.get_all_keywords()
+        with metrics.timer("match"):
+            counts = [count_keywords(parsed[4], keywords) for parsed in parsed_batch]
+
+        with metrics.timer("write"):
+            try:
+                resume_ids = self.db.add_resumes_bulk(parsed_batch, commit=False)
+
+                matches = [(resume_id, keyword_id, count)
+                           for resume_id, resume_counts in zip(resume_ids, counts)
+                           for keyword_id, count in resume_counts]
+                self.db.add_keyword_matches_bulk(matches, commit=False)
+
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+        metrics.count("resumes_written", len(resume_ids))
+        metrics.count("keyword_matches_written", len(matches))
+        return resume_ids
+
+    def hash_all(self, filenames):
+        """Return a (content_hash, error) pair for each file, in input order"""
+        def hash_one(filename):
+            try:
+                return file_hash(filename), None
+            except Exception as e:
+                return None, str(e)
+
+        # hashlib releases the GIL on large buffers, so threads hash in parallel
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(hash_one, filenames))
+
+    def parse_all(self, jobs, cancel=None):
+        """Yield (job, parsed, error) for each (filename, content_hash) job, in input order.
+
+        Parsing is fanned out across a process pool; small batches and
+        single-worker engines parse in-process to avoid pool start-up cost.
+        Stops early once the optional cancel event is set.
+        """
+        if self.workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                if cancel is not None and cancel.is_set():
+                    return
+                try:
+                    yield job, parse_resume(*job, self.cache_dir), None
+                except Exception as e:
+                    yield job, None, str(e)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)),
+                                 initializer=_init_worker) as executor:
+            # Workers are separate processes, so their metrics come back with the result
+            collect = metrics.enabled
+            parse = _parse_resume_with_metrics if collect else parse_resume
+            futures = [executor.submit(parse, *job, self.cache_dir) for job in jobs]
+            try:
+                for job, future in zip(jobs, futures):
+                    if cancel is not None and cancel.is_set():
+                        return
+                    try:
+                        parsed = future.result()
+                    except Exception as e:
+                        yield job, None, str(e)
+                        continue
+                    if collect:
+                        parsed, recorded = parsed
+                        metrics.merge(recorded)
+                    yield job, parsed, None
+            finally:
+                # Drop queued work so cancelling doesn't wait for the whole batch
+                for future in futures:
+                    future.cancel()
+
+    def ingest(self, filenames, progress=None, cancel=None):
+        """Parse and store resumes, returning a (filename, resume_id, error, duplicate) report.
+
+        Exactly one of resume_id and error is set for each file. Files whose
+        bytes match a stored resume, or an earlier file in the batch, are not
+        extracted again: they are reported with duplicate=True and the ID of
+        that resume. progress is called with (done, total) as files are
+        handled; if cancel is set, the report only covers the files handled
+        before it was.
+        """
+        filenames = list(filenames)
+        report = [None] * len(filenames)
+
+        # Hash every file first so byte-identical uploads skip extraction
+        hashes = self.hash_all(filenames)
+        existing = self.db.get_resume_ids_by_hash([content_hash for content_hash, _ in hashes if content_hash])
+
+        jobs = []  # (filename, content_hash) to extract
+        job_indexes = []
+        first_seen = {}  # content_hash -> report index of its first file in this batch
+        repeats = []  # (report index, index of the identical earlier file)
+        for index, (filename, (content_hash, error)) in enumerate(zip(filenames, hashes)):
+            if error is not None:
+                report[index] = (filename, None, error, False)
+            elif content_hash in existing:
+                report[index] = (filename, existing[content_hash], None, True)
+            elif content_hash in first_seen:
+                repeats.append((index, first_seen[content_hash]))
+            else:
+                first_seen[content_hash] = index
+                jobs.append((filename, content_hash))
+                job_indexes.append(index)
+
+        done = len(filenames) - len(jobs) - len(repeats)
+        if progress is not None and done:
+            progress(done, len(filenames))
+
+        # Writes go through the shared writer thread, so concurrent ingests
+        # are committed together and parsing carries on while they are written
+        writes = []  # (report index, future resume ID)
+        for index, (job, parsed, error) in zip(job_indexes, self.parse_all(jobs, cancel)):
+            report[index] = (job[0], None, error, False)
+            if error is None:
+                writes.append((index, self.writer().submit(parsed)))
+
+            done += 1
+            if progress is not None:
+                progress(done, len(filenames))
+
+        for index, future in writes:
+            try:
+                report[index] = (report[index][0], future.result(), None, False)
+            except Exception as e:
+                report[index] = (report[index][0], None, str(e), False)
+
+        # Repeats within the batch share the outcome of their first copy
+        for index, first_index in repeats:
+            if report[first_index] is not None:
+                _, resume_id, error, _ = report[first_index]
+                report[index] = (filenames[index], resume_id, error, True)
+                done += 1
+        if progress is not None and repeats:
+            progress(done, len(filenames))
+
+        report = [entry for entry in report if entry is not None]
+        if jobs and self.cache_dir:
+            ExtractionCache(self.cache_dir, self.cache_size).prune()
+        if metrics.enabled:
+            metrics.count("files_failed", sum(1 for _, _, error, _ in report if error is not None))
+            metrics.count("files_duplicate", sum(1 for _, _, error, duplicate in report if duplicate and error is None))
+            metrics.count("files_ingested", sum(1 for _, _, error, duplicate in report if not duplicate and error is None))
+        return report
+
+    def writer(self):
+        """The engine's group-commit writer, started on first use"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = GroupCommitWriter(self.save_batch, self.batch_size,
+                                                 self.commit_delay, self.max_queue)
+            return self._writer
+
+    def close(self):
+        """Finish queued writes and stop the writer thread"""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def backfill_keywords(self, progress=None, cancel=None):
+        """Score stored resumes against keywords added since they were ingested.
+
+        Streams resumes in ID order, matching only the pending keywords, and
+        records how far it got after every batch so an interrupted backfill
+        picks up where it stopped. Returns the number of resumes scanned.
+        """
+        pending = self.db.get_pending_backfills()
+        if not pending:
+            return 0
+
+        keyword_ids = [keyword_id for keyword_id, _, _, _ in pending]
+        matcher = KeywordMatcher([(keyword_id, keyword, weight)
+                                  for keyword_id, keyword, weight, _ in pending])
+
+        after_id = min(last_resume_id for _, _, _, last_resume_id in pending)
+        scanned = 0
+        while True:
+            if cancel is not None and cancel.is_set():
+                return scanned
+
+            rows = self.db.get_resume_contents(after_id, self.backfill_batch_size)
+            if not rows:
+                break
+
+            with metrics.timer("match"):
+                matches = [(resume_id, keyword_id, count)
+                           for resume_id, content in rows
+                           for keyword_id, count in matcher.count(content)]
+            with metrics.timer("write"):
+                self.db.save_backfill_batch(keyword_ids, rows[0][0], rows[-1][0], matches)
+            metrics.count("keyword_matches_written", len(matches))
+
+            after_id = rows[-1][0]
+            scanned += len(rows)
+            if progress is not None:
+                progress(scanned)
+
+        self.db.finish_backfills(keyword_ids)
+        return scanned
@@ -0,0 +1,105 @@
+import re
+
+
+class KeywordMatcher:
+    """Count many keywords in a single pass over a text.
+
+    Gives the same counts as running
+    re.findall(r'\b' + re.escape(keyword) + r'\b', text, re.IGNORECASE)
+    once per keyword, but all keywords are compiled into one trie-shaped
+    pattern so the text is scanned once however many keywords there are.
+    """
+
+    def __init__(self, keywords):
+        # keywords are (keyword_id, keyword, weight) rows from the database
+        self.key = keyword_set_key(keywords)
+
+        self.ids_by_keyword = {}
+        for keyword_id, keyword in self.key:
+            if keyword:
+                self.ids_by_keyword.setdefault(keyword.lower(), []).append(keyword_id)
+
+        # The pattern reports the longest keyword starting at each position,
+        # so shorter keywords that are prefixes of it are checked separately
+        self.prefixes = {}
+        for keyword in self.ids_by_keyword:
+            self.prefixes[keyword] = [
+                (other, re.compile(re.escape(other) + r'\b', re.IGNORECASE))
+                for other in self.ids_by_keyword
+                if other != keyword and keyword.startswith(other)
+            ]
+
+        self.pattern = None
+        if self.ids_by_keyword:
+            # Zero-width lookahead so overlapping keywords are all found
+            self.pattern = re.compile(r'(?=\b(' + _trie_pattern(self.ids_by_keyword) + r')\b)',
+                                      re.IGNORECASE)
+
+    def count(self, text):
+        """Return a list of (keyword_id, count) for keywords found in text"""
+        if self.pattern is None:
+            return []
+
+        counts = {}
+        last_end = {}  # findall counts non-overlapping matches per keyword
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            keyword = self._lookup(match.group(1))
+            candidates = [(keyword, start + len(match.group(1)))]
+            for other, other_pattern in self.prefixes[keyword]:
+                prefix_match = other_pattern.match(text, start)
+                if prefix_match:
+                    candidates.append((other, prefix_match.end()))
+
+            for found, end in candidates:
+                if start >= last_end.get(found, 0):
+                    counts[found] = counts.get(found, 0) + 1
+                    last_end[found] = end
+
+        matches = []
+        for keyword, count in counts.items():
+            for keyword_id in self.ids_by_keyword[keyword]:
+                matches.append((keyword_id, count))
+        return matches
+
+    def _lookup(self, matched):
+        """Map matched text back to the lowercased keyword it came from"""
+        keyword = matched.lower()
+        if keyword in self.ids_by_keyword:
+            return keyword
+
+        # Case-insensitive matching can differ from str.lower() for a few characters
+        for keyword in self.ids_by_keyword:
+            if re.fullmatch(re.escape(keyword), matched, re.IGNORECASE):
+                return keyword
+        raise KeyError(matched)
+
+
+def keyword_set_key(keywords):
+    """Identify a keyword set independently of weights"""
+    return tuple((keyword_id, keyword) for keyword_id, keyword, *_ in keywords)
+
+
+def _trie_pattern(words):
+    """Build a regex alternation that shares common prefixes between words"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [re.escape(char) + _node_pattern(child)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+
+    if len(branches) == 1 and '' not in node:
+        return branches[0]
+
+    pattern = '(?:' + '|'.join(branches) + ')'
+    # Optional when a word ends here; greedy so the longest word is tried first
+    return pattern + '?' if '' in node else pattern
@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+# Per-stage timers and counters for the ingestion and search pipeline
+#
+# Off by default: set RESUME_METRICS=1, or call metrics.enable(). While
+# off, timer() hands back a shared no-op context manager and count()
+# returns at once, so instrumented code pays one attribute check.
+#
+# Searches slower than RESUME_SLOW_QUERY_MS (default 500) are logged to the
+# "resume_screening.slow_queries" logger whether or not metrics are on.
+
+slow_query_log = logging.getLogger("resume_screening.slow_queries")
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, metrics, stage, query):
+        self.metrics = metrics
+        self.stage = stage
+        self.query = query
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.stage, time.perf_counter() - self.start, self.query)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled=False, slow_query_threshold=0.5, slow_query_history=100):
+        self.enabled = enabled
+        # Seconds; None turns the slow-query log off
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_queries = deque(maxlen=slow_query_history)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}  # stage -> [count, total seconds, max seconds]
+            self.counters = {}
+            self.slow_queries.clear()
+            self.started = time.time()
+
+    def timer(self, stage, query=None):
+        """Context manager timing one run of a stage.
+
+        query describes a search, for the slow-query log.
+        """
+        if self.enabled or (query is not None and self.slow_query_threshold is not None):
+            return _Timer(self, stage, query)
+        return _NULL_TIMER
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, stage, seconds, query=None):
+        if self.enabled:
+            with self.lock:
+                totals = self.stages.setdefault(stage, [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += seconds
+                totals[2] = max(totals[2], seconds)
+
+        if query is not None and self.slow_query_threshold is not None and seconds >= self.slow_query_threshold:
+            entry = dict(query, stage=stage, ms=round(seconds * 1000, 3), at=time.time())
+            self.slow_queries.append(entry)
+            slow_query_log.warning("slow %s: %s", stage, json.dumps(entry))
+
+    def take(self):
+        """Return the raw stage totals and counters and reset them, for merge() in another process"""
+        with self.lock:
+            raw = {'stages': self.stages, 'counters': self.counters}
+            self.stages = {}
+            self.counters = {}
+        return raw
+
+    def merge(self, raw):
+        """Add totals taken from another process's Metrics"""
+        if not self.enabled:
+            return
+        with self.lock:
+            for stage, (count, total, longest) in raw['stages'].items():
+                totals = self.stages.setdefault(stage, [0, 0.0, 0.0])
+                totals[0] += count
+                totals[1] += total
+                totals[2] = max(totals[2], longest)
+            for name, amount in raw['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """A JSON-serializable view of every stage, counter and recent slow query"""
+        with self.lock:
+            stages = {stage: {'count': count, 'total_ms': round(total * 1000, 3),
+                              'mean_ms': round(total * 1000 / count, 3), 'max_ms': round(longest * 1000, 3)}
+                      for stage, (count, total, longest) in sorted(self.stages.items())}
+            return {
+                'enabled': self.enabled,
+                'since': self.started,
+                'stages': stages,
+                'counters': dict(sorted(self.counters.items())),
+                'slow_queries': list(self.slow_queries),
+            }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def format_table(self):
+        """A plain-text table of the snapshot, for the stats panel and the CLI"""
+        snapshot = self.snapshot()
+        lines = [f"{'stage':<16}{'count':>9}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+        for stage, totals in snapshot['stages'].items():
+            lines.append(f"{stage:<16}{totals['count']:>9}{totals['total_ms']:>12.1f}"
+                         f"{totals['mean_ms']:>10.2f}{totals['max_ms']:>10.2f}")
+        if snapshot['counters']:
+            lines.append("")
+            lines.extend(f"{name:<28}{value:>9}" for name, value in snapshot['counters'].items())
+        if snapshot['slow_queries']:
+            lines.append("")
+            lines.append("slow queries")
+            lines.extend(f"  {entry['ms']:>9.1f} ms  {entry.get('mode', '')} {entry.get('keywords', '')}"
+                         for entry in snapshot['slow_queries'])
+        return "\n".join(lines)
+
+
+def _threshold_from_env():
+    value = os.environ.get("RESUME_SLOW_QUERY_MS", "500")
+    return None if value.lower() in ("", "off", "none") else float(value) / 1000
+
+
+# Shared by every module in the process
+metrics = Metrics(enabled=os.environ.get("RESUME_METRICS", "") not in ("", "0"),
+                  slow_query_threshold=_threshold_from_env())
@@ -0,0 +1,89 @@
+import hashlib
+import re
+import struct
+
+_WORD = re.compile(r'\w+')
+
+
+class MinHasher:
+    """MinHash signatures of resume text, for finding near-duplicates.
+
+    Text is split into overlapping runs of shingle_size words. Each shingle
+    is hashed once and the hash picks one of num_hashes bins, keeping the
+    smallest value per bin (one-permutation hashing); empty bins borrow from
+    the next filled bin. Two signatures agree in about the same fraction of
+    positions as the Jaccard similarity of the two shingle sets.
+
+    For locality-sensitive lookup the signature is cut into `bands` bands;
+    resumes sharing any whole band are candidates. With the default 16
+    bands of 8, pairs at 0.8 similarity share a band about 95% of the time
+    and pairs at 0.5 about 6% of the time.
+    """
+
+    def __init__(self, num_hashes=128, bands=16, shingle_size=5):
+        if num_hashes % bands:
+            raise ValueError("num_hashes must be a multiple of bands")
+        self.num_hashes = num_hashes
+        self.bands = bands
+        self.rows = num_hashes // bands
+        self.shingle_size = shingle_size
+        self._format = f"<{num_hashes}Q"
+        # Bin values are below 2**64 / num_hashes, so a borrowed value plus
+        # its distance in units of this offset still fits in 64 bits
+        self._offset = (1 << 64) // num_hashes
+
+    def shingles(self, text):
+        """Hashes of the distinct runs of shingle_size words in the text"""
+        words = _WORD.findall(text.lower())
+        size = min(self.shingle_size, len(words))
+        if not size:
+            return set()
+        return {int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode('utf-8'),
+                                               digest_size=8).digest(), 'little')
+                for i in range(len(words) - size + 1)}
+
+    def signature(self, text):
+        """The signature as a tuple of num_hashes ints, or None for text without words"""
+        hashes = self.shingles(text)
+        if not hashes:
+            return None
+
+        empty = 1 << 64
+        bins = [empty] * self.num_hashes
+        for value in hashes:
+            index = value % self.num_hashes
+            value //= self.num_hashes
+            if value < bins[index]:
+                bins[index] = value
+
+        # Fill each empty bin from the nearest filled bin to its right, offset
+        # by the distance so different gaps don't collide
+        filled = [index for index, value in enumerate(bins) if value != empty]
+        if len(filled) < self.num_hashes:
+            next_filled = filled[0] + self.num_hashes
+            for index in range(self.num_hashes - 1, -1, -1):
+                if bins[index] != empty:
+                    next_filled = index
+                else:
+                    source = next_filled % self.num_hashes
+                    bins[index] = bins[source] + (next_filled - index) * self._offset
+        return tuple(bins)
+
+    def band_keys(self, signature):
+        """A signed 64-bit bucket key for each band of the signature"""
+        packed = self.pack(signature)
+        width = self.rows * 8
+        return [int.from_bytes(hashlib.blake2b(packed[band * width:(band + 1) * width],
+                                               digest_size=8).digest(), 'little', signed=True)
+                for band in range(self.bands)]
+
+    def pack(self, signature):
+        return struct.pack(self._format, *signature)
+
+    def unpack(self, data):
+        return struct.unpack(self._format, data)
+
+    @staticmethod
+    def similarity(first, second):
+        """Estimated Jaccard similarity of the texts behind two signatures"""
+        return sum(1 for a, b in zip(first, second) if a == b) / len(first)
@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+from database import Database
+from ingestion import IngestionEngine
+from metrics import metrics
+
+# Local HTTP service over the resume database
+#
+#   python service.py [--db FILE] [--host HOST] [--port PORT] [--threads N]
+#
+#   GET    /search?q=python,sql[&limit=50][&after=SCORE,ID][&mode=index|fts|tfidf]
+#   POST   /match             {"text": "<job description>", "limit": 10}
+#   GET    /resumes/ID
+#   GET    /duplicates[?threshold=0.8]   clusters of near-duplicate resumes
+#   GET    /keywords
+#   POST   /keywords          {"keyword": "Python", "weight": 8}
+#   DELETE /keywords/ID
+#   POST   /ingest            {"paths": ["/path/to/resume.pdf", ...]}
+#   GET    /metrics           per-stage timings and counters (see metrics.py)
+#
+# Requests are handled on a fixed pool of threads. The Database gives each
+# thread its own connection, so the pool doubles as a connection pool and
+# searches read from WAL snapshots while ingestion writes.
+
+# Larger limits are cut down to this many results per request
+MAX_LIMIT = 1000
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ResumeService:
+    """Request handling independent of the HTTP plumbing"""
+
+    def __init__(self, db, engine=None):
+        self.db = db
+        self.engine = engine or IngestionEngine(db)
+        self.backfill_lock = threading.Lock()
+
+    def search(self, query):
+        keywords = [keyword.strip() for keyword in query.get('q', [''])[0].split(',') if keyword.strip()]
+        if not keywords:
+            raise HTTPError(400, "q must list at least one keyword")
+        try:
+            limit = int(query.get('limit', ['50'])[0])
+            after = None
+            if 'after' in query:
+                score, resume_id = query['after'][0].split(',')
+                after = (float(score), int(resume_id))
+        except ValueError:
+            raise HTTPError(400, "limit must be an integer and after must be SCORE,ID")
+        if limit < 1:
+            raise HTTPError(400, "limit must be a positive integer")
+        limit = min(limit, MAX_LIMIT)
+        mode = query.get('mode', ['index'])[0]
+        if mode == 'fts' and not self.db.has_fts():
+            raise HTTPError(400, "full-text search is not enabled for this database")
+        if mode == 'tfidf' and self.db.tfidf is None:
+            raise HTTPError(400, "TF-IDF ranking is not enabled for this database")
+
+        try:
+            results, next_cursor = self.db.search_resumes_page(keywords, limit, after, mode)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return {
+            'results': [{'id': resume_id, 'name': name, 'email': email, 'phone': phone, 'score': score}
+                        for resume_id, name, email, phone, score in results],
+            'next': None if next_cursor is None else f"{next_cursor[0]},{next_cursor[1]}",
+        }
+
+    def match(self, body):
+        text = body.get('text')
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(400, "text must be a job description")
+        limit = body.get('limit', 10)
+        if not isinstance(limit, int) or limit < 1:
+            raise HTTPError(400, "limit must be a positive integer")
+        limit = min(limit, MAX_LIMIT)
+        if self.db.tfidf is None:
+            raise HTTPError(400, "TF-IDF ranking is not enabled for this database")
+
+        results = self.db.match_job_description(text, limit)
+        return {'results': [{'id': resume_id, 'name': name, 'email': email, 'phone': phone, 'score': score,
+                             'terms': [{'term': term, 'contribution': contribution} for term, contribution in terms]}
+                            for resume_id, name, email, phone, score, terms in results]}
+
+    def get_resume(self, resume_id):
+        resume = self.db.get_resume_by_id(resume_id)
+        if resume is None:
+            raise HTTPError(404, f"no resume with id {resume_id}")
+        _, filename, name, email, phone, content = resume
+        return {
+            'id': resume_id, 'filename': filename, 'name': name, 'email': email, 'phone': phone,
+            'content': content,
+            'matches': [{'keyword': keyword, 'count': count, 'weight': weight}
+                        for keyword, count, weight in self.db.get_keyword_matches(resume_id)],
+            'near_duplicates': [{'id': other_id, 'filename': other_filename, 'name': other_name,
+                                 'similarity': similarity}
+                                for other_id, other_filename, other_name, similarity
+                                in self.db.get_near_duplicates(resume_id)],
+        }
+
+    def get_duplicates(self, query):
+        try:
+            threshold = float(query.get('threshold', [self.db.near_duplicate_threshold])[0])
+        except ValueError:
+            raise HTTPError(400, "threshold must be a number")
+        if not 0 < threshold <= 1:
+            raise HTTPError(400, "threshold must be above 0 and at most 1")
+        return {'clusters': self.db.find_duplicate_clusters(threshold)}
+
+    def get_keywords(self):
+        return {'keywords': [{'id': keyword_id, 'keyword': keyword, 'weight': weight}
+                             for keyword_id, keyword, weight in self.db.get_all_keywords()]}
+
+    def add_keyword(self, body):
+        keyword = str(body.get('keyword', '')).strip()
+        if not keyword:
+            raise HTTPError(400, "keyword is required")
+        weight = body.get('weight', 5)
+        if not isinstance(weight, int) or not 1 <= weight <= 10:
+            raise HTTPError(400, "weight must be an integer from 1 to 10")
+
+        keyword_id = self.db.add_keyword(keyword, weight)
+        self.start_backfill()
+        return {'id': keyword_id, 'keyword': keyword, 'weight': weight}
+
+    def delete_keyword(self, keyword_id):
+        self.db.delete_keyword(keyword_id)
+        return {'deleted': keyword_id}
+
+    def ingest(self, body):
+        paths = body.get('paths')
+        if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+            raise HTTPError(400, "paths must be a list of file paths")
+        report = self.engine.ingest(paths)
+        return {'report': [{'path': path, 'resume_id': resume_id, 'error': error, 'duplicate': duplicate}
+                           for path, resume_id, error, duplicate in report]}
+
+    def start_backfill(self):
+        """Score stored resumes against new keywords on a background thread"""
+        if self.backfill_lock.acquire(blocking=False):
+            threading.Thread(target=self.run_backfill, daemon=True).start()
+
+    def run_backfill(self):
+        while True:
+            try:
+                # Keywords added while a pass runs are picked up by the next one
+                while self.db.get_pending_backfills():
+                    self.engine.backfill_keywords()
+            finally:
+                self.backfill_lock.release()
+            # A keyword added just before the release found the lock taken
+            if not self.db.get_pending_backfills() or not self.backfill_lock.acquire(blocking=False):
+                return
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def dispatch(self, method):
+        try:
+            self.send_json(200, self.route(method, urlparse(self.path)))
+        except HTTPError as e:
+            self.send_json(e.status, {'error': e.message})
+        except Exception as e:
+            self.send_json(500, {'error': str(e)})
+
+    def route(self, method, url):
+        """Call the service for an endpoint and return its JSON payload"""
+        service = self.server.service
+        resume = re.fullmatch(r'/resumes/(\d+)', url.path)
+        keyword = re.fullmatch(r'/keywords/(\d+)', url.path)
+
+        if url.path == '/search':
+            allowed = {'GET': lambda: service.search(parse_qs(url.query))}
+        elif url.path == '/match':
+            allowed = {'POST': lambda: service.match(self.read_body())}
+        elif resume:
+            allowed = {'GET': lambda: service.get_resume(int(resume.group(1)))}
+        elif url.path == '/duplicates':
+            allowed = {'GET': lambda: service.get_duplicates(parse_qs(url.query))}
+        elif url.path == '/keywords':
+            allowed = {'GET': service.get_keywords,
+                       'POST': lambda: service.add_keyword(self.read_body())}
+        elif keyword:
+            allowed = {'DELETE': lambda: service.delete_keyword(int(keyword.group(1)))}
+        elif url.path == '/ingest':
+            allowed = {'POST': lambda: service.ingest(self.read_body())}
+        elif url.path == '/metrics':
+            allowed = {'GET': metrics.snapshot}
+        else:
+            raise HTTPError(404, f"no such endpoint: {url.path}")
+
+        if method not in allowed:
+            raise HTTPError(405, f"{method} not allowed on {url.path}")
+        return allowed[method]()
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise HTTPError(400, "request body must be JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        return body
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """HTTPServer that handles requests on a fixed pool of worker threads"""
+
+    # Room for bursts of connections waiting for a free thread
+    request_queue_size = 128
+
+    def __init__(self, address, service, threads=8, quiet=False):
+        super().__init__(address, RequestHandler)
+        self.service = service
+        self.quiet = quiet
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def make_server(db, host='127.0.0.1', port=8000, threads=8, quiet=False):
+    return ThreadPoolHTTPServer((host, port), ResumeService(db), threads, quiet)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resume search and ingestion over local HTTP")
+    parser.add_argument("--db", default="resume_screening.db", help="database file (default: %(default)s)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=8, help="request threads (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    db = Database(os.path.abspath(args.db))
+    db.create_tables()
+    if Database.fts5_supported():
+        db.enable_fts()
+    if Database.tfidf_supported():
+        db.enable_tfidf(os.path.splitext(db.db_path)[0] + ".tfidf.npz")
+
+    server = make_server(db, args.host, args.port, args.threads)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.engine.close()
+        if db.tfidf is not None:
+            db.tfidf.save()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@ setup(
     name="resume_screening_app",
     version="1.0.0",
     packages=find_packages(),
+    # The application is a set of top-level modules, not a package
+    py_modules=[
+        "app", "database", "duplicates_cli", "field_extractor", "ingest_cli", "ingestion",
+        "keyword_matcher", "metrics", "minhash", "service", "tfidf", "watcher", "widgets", "writer",
+    ],
     install_requires=[
         "PyPDF2>=3.0.0",
         "docx2txt>=0.8",
@@ -11,9 +16,14 @@ setup(
         "tkinter",  # Added missing dependency
         "sqlite3",  # Added missing dependency
     ],
+    extras_require={
+        'tfidf': ["numpy>=1.17", "scipy>=1.4"],
+    },
     entry_points={
         'console_scripts': [
             'resume-screening=app:main',
+            'resume-ingest=ingest_cli:main',
+            'resume-duplicates=duplicates_cli:main',
         ],
     },
     author="Abhishek Singh",  # Fixed spelling
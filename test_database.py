@@ -1,6 +1,8 @@
 import os
+import sqlite3
+import threading
 import unittest
-from database import Database
+from database import Database, tokenize
 
 class TestDatabase(unittest.TestCase):
     def setUp(self):
@@ -122,5 +124,324 @@ class TestDatabase(unittest.TestCase):
         results = self.db.search_resumes(["Python", "Java"])
         self.assertEqual(len(results), 2)
 
+    def test_add_resumes_bulk(self):
+        # Add several resumes in one transaction
+        resume_ids = self.db.add_resumes_bulk([
+            ("resume1.pdf", "John Doe", "john.doe@example.com", "123-456-7890", "Python developer."),
+            ("resume2.pdf", "Jane Smith", "jane.smith@example.com", "987-654-3210", "Java developer."),
+            ("resume3.pdf", "Bob Brown", "bob.brown@example.com", "555-555-5555", "SQL analyst."),
+        ], batch_size=2)
+        
+        # IDs come back in input order
+        self.assertEqual(len(resume_ids), 3)
+        self.assertEqual(self.db.get_resume_by_id(resume_ids[0])[2], "John Doe")
+        self.assertEqual(self.db.get_resume_by_id(resume_ids[2])[2], "Bob Brown")
+    
+    def test_add_keyword_matches_bulk(self):
+        resume_id = self.db.add_resume("test_resume.pdf", "John Doe", "john.doe@example.com",
+                                       "123-456-7890", "Python and SQL.")
+        python_id = self.db.add_keyword("Python", 8)
+        sql_id = self.db.add_keyword("SQL", 6)
+        
+        # Writes made with commit=False are discarded on rollback
+        self.db.add_keyword_matches_bulk([(resume_id, python_id, 1)], commit=False)
+        self.db.rollback()
+        self.assertEqual(self.db.get_keyword_matches(resume_id), [])
+        
+        self.db.add_keyword_matches_bulk([(resume_id, python_id, 2), (resume_id, sql_id, 1)])
+        matches = self.db.get_keyword_matches(resume_id)
+        self.assertEqual(matches, [("Python", 2, 8), ("SQL", 1, 6)])
+
+    def test_search_uses_inverted_index(self):
+        resume1_id = self.db.add_resume("resume1.pdf", "John Doe", "john.doe@example.com",
+                                        "123-456-7890", "Machine learning engineer using Python.")
+        resume2_id = self.db.add_resume("resume2.pdf", "Jane Smith", "jane.smith@example.com",
+                                        "987-654-3210", "JavaScript developer, learning machine design.")
+        
+        # Multi-word keywords need all of their terms; terms match whole words
+        results = self.db.search_resumes(["machine learning"])
+        self.assertEqual(len(results), 2)
+        self.assertEqual(self.db.search_resumes(["Java"]), [])
+        self.assertEqual([r[0] for r in self.db.search_resumes(["PYTHON"])], [resume1_id])
+        
+        # Deleting a resume removes its postings
+        self.db.delete_resume(resume1_id)
+        self.assertEqual(self.db.search_resumes(["python"]), [])
+        self.db.cursor.execute("SELECT COUNT(*) FROM postings WHERE resume_id = ?", (resume1_id,))
+        self.assertEqual(self.db.cursor.fetchone()[0], 0)
+
+    def test_search_terms_with_symbols(self):
+        vitamin_id = self.db.add_resume("vitamin.pdf", "", "", "", "Vitamin C research. Skills: C# and F#.")
+        net_id = self.db.add_resume("net.pdf", "", "", "", "Fishing net repair since 2010.")
+        cpp_id = self.db.add_resume("cpp.pdf", "", "", "", "Embedded C++ developer.")
+        dotnet_id = self.db.add_resume("dotnet.pdf", "", "", "", "Built services on .NET (C#); some Node.js.")
+
+        def search(keyword):
+            return sorted(r[0] for r in self.db.search_resumes([keyword]))
+
+        self.assertEqual(search("C++"), [cpp_id])
+        self.assertEqual(search("c#"), [vitamin_id, dotnet_id])
+        self.assertEqual(search(".NET"), [dotnet_id])
+        self.assertEqual(search("net"), [net_id])
+        self.assertEqual(search("Node.js"), [dotnet_id])
+        # Dots ending a sentence are not part of the word
+        self.assertEqual(search("research"), [vitamin_id])
+
+    def test_search_run_together_words(self):
+        # PDF extraction often drops the space after a full stop
+        joined_id = self.db.add_resume("joined.pdf", "", "", "", "Senior developer.Python and SQL")
+        dotted_id = self.db.add_resume("dotted.pdf", "", "", "", "Experience...Python, 5 years")
+
+        self.assertEqual(tokenize("developer.Python"), ["developer", "python"])
+        self.assertEqual(tokenize("Experience...Python"), ["experience", "python"])
+        self.assertEqual(tokenize("Skills:.NET, Node.js"), ["skills", ".net", "node.js"])
+        self.assertEqual(sorted(r[0] for r in self.db.search_resumes(["python"])), [joined_id, dotted_id])
+
+    def make_legacy_database(self):
+        # Build a database with the original, unversioned schema
+        del self.db
+        os.remove(self.test_db_file)
+        conn = sqlite3.connect(self.test_db_file)
+        conn.executescript('''
+        CREATE TABLE resumes (id INTEGER PRIMARY KEY AUTOINCREMENT, filename TEXT NOT NULL,
+                              name TEXT, email TEXT, phone TEXT, content TEXT NOT NULL);
+        CREATE TABLE keywords (id INTEGER PRIMARY KEY AUTOINCREMENT, keyword TEXT NOT NULL UNIQUE,
+                               weight INTEGER DEFAULT 5);
+        CREATE TABLE keyword_matches (id INTEGER PRIMARY KEY AUTOINCREMENT, resume_id INTEGER,
+                                      keyword_id INTEGER, count INTEGER DEFAULT 0,
+                                      FOREIGN KEY (resume_id) REFERENCES resumes (id) ON DELETE CASCADE,
+                                      FOREIGN KEY (keyword_id) REFERENCES keywords (id) ON DELETE CASCADE);
+        INSERT INTO resumes (filename, name, email, phone, content)
+        VALUES ('resume1.pdf', 'John Doe', 'john.doe@example.com', '123-456-7890', 'Python developer.');
+        INSERT INTO keywords (keyword, weight) VALUES ('Python', 8);
+        INSERT INTO keyword_matches (resume_id, keyword_id, count) VALUES (1, 1, 1), (1, 1, 1), (1, 99, 3);
+        ''')
+        conn.close()
+
+    def test_migrate_legacy_database(self):
+        self.make_legacy_database()
+        self.db = Database(self.test_db_file)
+        self.db.create_tables()
+        
+        self.db.cursor.execute("PRAGMA user_version")
+        self.assertEqual(self.db.cursor.fetchone()[0], len(Database.MIGRATIONS))
+        
+        # Duplicate and orphaned matches are gone and the resume is indexed
+        self.assertEqual(self.db.get_keyword_matches(1), [("Python", 1, 8)])
+        self.assertEqual([r[0] for r in self.db.search_resumes(["Python"])], [1])
+        self.assertEqual(self.db.find_near_duplicates("Python developer."), [(1, 1.0)])
+        
+        # Indexes are used and deleting a keyword cascades to its matches
+        self.db.cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM keyword_matches WHERE resume_id = 1")
+        self.assertIn("idx_keyword_matches_resume_keyword", self.db.cursor.fetchone()[3])
+        self.db.delete_keyword(1)
+        self.db.cursor.execute("SELECT COUNT(*) FROM keyword_matches")
+        self.assertEqual(self.db.cursor.fetchone()[0], 0)
+    
+    def test_concurrent_migrations(self):
+        # Several processes opening an old database at once must not both migrate
+        self.make_legacy_database()
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def open_database():
+            db = Database(self.test_db_file)
+            try:
+                barrier.wait()
+                db.create_tables()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=open_database) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+        self.db = Database(self.test_db_file)
+        self.db.cursor.execute("PRAGMA user_version")
+        self.assertEqual(self.db.cursor.fetchone()[0], len(Database.MIGRATIONS))
+        self.assertEqual(self.db.get_keyword_matches(1), [("Python", 1, 8)])
+
+    @unittest.skipUnless(Database.fts5_supported(), "SQLite built without FTS5")
+    def test_fts_search(self):
+        # Resumes stored before FTS is enabled are backfilled into the index
+        resume1_id = self.db.add_resume("resume1.pdf", "John Doe", "john.doe@example.com",
+                                        "123-456-7890", "Python developer. Python, Python and SQL.")
+        self.db.enable_fts()
+        self.assertTrue(self.db.has_fts())
+        
+        # Later inserts and deletes are kept in sync by triggers
+        resume2_id = self.db.add_resume("resume2.pdf", "Jane Smith", "jane.smith@example.com",
+                                        "987-654-3210", "Java developer who knows some Python.")
+        resume3_id = self.db.add_resume("resume3.pdf", "Bob Brown", "bob.brown@example.com",
+                                        "555-555-5555", "Machine learning with Python.")
+        
+        results = self.db.search_resumes(["Python"], mode="fts")
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0][0], resume1_id)
+        
+        self.assertEqual([r[0] for r in self.db.search_resumes(["machine learning"], mode="fts")], [resume3_id])
+        
+        self.db.delete_resume(resume1_id)
+        self.assertEqual(sorted(r[0] for r in self.db.search_resumes(["Python"], mode="fts")),
+                         [resume2_id, resume3_id])
+
+    def test_compressed_content(self):
+        content = "Python developer. " * 100
+        plain_id = self.db.add_resume("resume1.pdf", "John Doe", "", "", content)
+        
+        self.db.compress_content = True
+        compressed_ids = [self.db.add_resume("resume2.pdf", "Jane Smith", "", "", content)]
+        compressed_ids += self.db.add_resumes_bulk([("resume3.pdf", "Bob Brown", "", "", content)])
+        
+        self.db.cursor.execute("SELECT typeof(content), length(content) FROM resumes ORDER BY id")
+        stored = self.db.cursor.fetchall()
+        self.assertEqual([kind for kind, _ in stored], ["text", "blob", "blob"])
+        self.assertLess(stored[1][1], len(content) // 10)
+        
+        # Reads decompress transparently and search still sees every resume
+        for resume_id in [plain_id] + compressed_ids:
+            self.assertEqual(self.db.get_resume_by_id(resume_id)[5], content)
+        self.assertEqual({row[5] for row in self.db.get_all_resumes()}, {content})
+        self.assertEqual({row[1] for row in self.db.get_resume_contents()}, {content})
+        self.assertEqual(len(self.db.search_resumes(["Python"])), 3)
+        
+        # Existing plain rows are compressed in place, and only once
+        self.assertEqual(self.db.compress_existing_content(), 1)
+        self.assertEqual(self.db.compress_existing_content(), 0)
+        self.assertEqual(self.db.get_resume_by_id(plain_id)[5], content)
+    
+    @unittest.skipUnless(Database.fts5_supported(), "SQLite built without FTS5")
+    def test_fts_with_compressed_content(self):
+        resume1_id = self.db.add_resume("resume1.pdf", "John Doe", "", "", "Python developer.")
+        self.db.compress_content = True
+        resume2_id = self.db.add_resume("resume2.pdf", "Jane Smith", "", "", "Java developer.")
+        self.db.enable_fts()
+        resume3_id = self.db.add_resume("resume3.pdf", "Bob Brown", "", "", "Python and Java.")
+        
+        self.db.compress_existing_content()
+        self.assertEqual(sorted(r[0] for r in self.db.search_resumes(["Java"], mode="fts")),
+                         [resume2_id, resume3_id])
+        self.db.delete_resume(resume3_id)
+        self.assertEqual([r[0] for r in self.db.search_resumes(["Python"], mode="fts")], [resume1_id])
+
+    def test_concurrent_reads_during_writes(self):
+        self.db.cursor.execute("PRAGMA journal_mode")
+        self.assertEqual(self.db.cursor.fetchone()[0], "wal")
+        
+        errors = []
+        writing = threading.Event()
+        
+        def write():
+            try:
+                for i in range(20):
+                    self.db.add_resumes_bulk([(f"resume{i}-{j}.pdf", "Candidate", "", "", "Python developer.")
+                                              for j in range(50)])
+            except sqlite3.Error as e:
+                errors.append(e)
+            finally:
+                writing.set()
+        
+        def read():
+            try:
+                while not writing.is_set():
+                    # Every snapshot sees whole transactions only
+                    self.assertEqual(len(self.db.search_resumes(["Python"])) % 50, 0)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(self.db.count_resumes(), 1000)
+
+    def test_near_duplicates(self):
+        text = ("Jane Smith. Senior data engineer with eight years of experience building batch and "
+                "streaming pipelines in Python, Spark and Kafka for retail and logistics companies. "
+                "Led a team of five engineers and migrated the warehouse to the cloud.")
+        original_id = self.db.add_resume("jane.pdf", "Jane Smith", "", "", text)
+        other_id = self.db.add_resume("bob.pdf", "Bob Brown", "", "", "Frontend developer. React and TypeScript.")
+        
+        # A lightly edited copy under another filename is recorded against the original
+        edited = text.replace("retail and logistics", "retail, travel and logistics")
+        copy_id, = self.db.add_resumes_bulk([("jane_smith_cv.docx", "Jane Smith", "", "", edited)])
+        duplicates = self.db.get_near_duplicates(copy_id)
+        self.assertEqual([row[:3] for row in duplicates], [(original_id, "jane.pdf", "Jane Smith")])
+        self.assertGreaterEqual(duplicates[0][3], 0.8)
+        self.assertEqual([row[0] for row in self.db.get_near_duplicates(original_id)], [copy_id])
+        self.assertEqual(self.db.get_near_duplicates(other_id), [])
+        
+        self.assertEqual([resume_id for resume_id, _ in self.db.find_near_duplicates(edited)],
+                         [copy_id, original_id])
+        self.assertEqual(self.db.find_near_duplicates("Frontend developer. Vue and JavaScript."), [])
+        self.assertEqual(self.db.find_duplicate_clusters(), [[original_id, copy_id]])
+        
+        self.db.delete_resume(original_id)
+        self.assertEqual(self.db.get_near_duplicates(copy_id), [])
+        self.assertEqual(self.db.find_duplicate_clusters(), [])
+    
+    def test_duplicate_clusters(self):
+        # Three copies of one resume, two of another and one on its own
+        base = "Backend engineer building payment services in Go and PostgreSQL at scale for many years"
+        ids = [self.db.add_resume(f"a{i}.txt", "", "", "", base + f" ref {i}") for i in range(3)]
+        other = "Nurse with ten years of intensive care experience and a passion for patient education"
+        ids += [self.db.add_resume(f"b{i}.txt", "", "", "", other) for i in range(2)]
+        self.db.add_resume("c.txt", "", "", "", "Accountant specialising in audits for small charities")
+        
+        self.assertEqual(self.db.find_duplicate_clusters(0.5), [ids[:3], ids[3:]])
+        self.assertEqual(self.db.find_duplicate_clusters(1.0), [ids[3:]])
+    
+    def test_search_resumes_page(self):
+        # Scores 0, 8, 8, 16, 16 and 24 so pages split ties
+        python_id = self.db.add_keyword("Python", 8)
+        resume_ids = self.db.add_resumes_bulk(
+            [(f"resume{i}.pdf", f"Candidate {i}", "", "", "Python developer.") for i in range(6)])
+        self.db.add_keyword_matches_bulk(
+            [(resume_id, python_id, count) for resume_id, count in zip(resume_ids, [0, 1, 1, 2, 2, 3])])
+        
+        pages = []
+        cursor = None
+        while True:
+            results, cursor = self.db.search_resumes_page(["Python"], limit=4 if not pages else 2, after=cursor)
+            pages.append(results)
+            if cursor is None:
+                break
+        
+        # Pages concatenate to the full ranking, with no gaps or repeats
+        self.assertEqual([len(page) for page in pages], [4, 2, 0])
+        self.assertEqual(sum(pages, []), self.db.search_resumes(["Python"]))
+        self.assertEqual([r[4] for r in pages[0]], [24, 16, 16, 8])
+        
+        self.assertEqual(self.db.search_resumes_page([]), ([], None))
+        with self.assertRaises(ValueError):
+            self.db.search_resumes_page(["Python"], limit=0)
+
+    def test_get_resume_summaries(self):
+        resume1_id = self.db.add_resume("resume1.pdf", "John Doe", "john.doe@example.com",
+                                        "123-456-7890", "Python developer.")
+        resume2_id = self.db.add_resume("resume2.pdf", "Jane Smith", "jane.smith@example.com",
+                                        "987-654-3210", "Java developer.")
+        
+        # Newest first, without content
+        self.assertEqual(self.db.get_resume_summaries(), [
+            (resume2_id, "resume2.pdf", "Jane Smith", "jane.smith@example.com", "987-654-3210"),
+            (resume1_id, "resume1.pdf", "John Doe", "john.doe@example.com", "123-456-7890"),
+        ])
+        self.assertEqual(self.db.get_resume_summary(resume1_id),
+                         (resume1_id, "resume1.pdf", "John Doe", "john.doe@example.com", "123-456-7890"))
+        self.assertIsNone(self.db.get_resume_summary(999))
+        
+        # Windows of the list for virtualized views
+        self.assertEqual(self.db.count_resumes(), 2)
+        self.assertEqual([r[0] for r in self.db.get_resume_summaries(1, 1)], [resume1_id])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
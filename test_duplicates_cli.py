@@ -0,0 +1,40 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from database import Database
+from duplicates_cli import main
+
+class TestDuplicatesCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "duplicates.db")
+        db = Database(self.db_path)
+        db.create_tables()
+        text = "Data analyst with five years of SQL, Tableau and Python reporting for finance teams."
+        db.add_resume("analyst.pdf", "Sam Lee", "sam@example.com", "", text)
+        db.add_resume("cv_final.docx", "Sam Lee", "sam@example.com", "", text + " Available immediately.")
+        db.add_resume("other.pdf", "Alex Kim", "", "", "Registered nurse on a busy surgical ward.")
+        db.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_main(self, *args):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main(["--db", self.db_path, *args]), 0)
+        return out.getvalue()
+
+    def test_report(self):
+        output = self.run_main()
+        self.assertIn("Cluster 1: 2 resumes", output)
+        self.assertIn("cv_final.docx", output)
+        self.assertNotIn("other.pdf", output)
+        self.assertEqual(json.loads(self.run_main("--json", "--threshold", "0.6"))['clusters'], [[1, 2]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from field_extractor import FieldExtractor, LINKEDIN_PATTERN
+
+class TestFieldExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = FieldExtractor()
+
+    def test_extracts_contact_fields(self):
+        samples = [
+            ("John Doe\njohn.doe@example.com\n123-456-7890\nPython developer.",
+             ("John Doe", "john.doe@example.com", "123-456-7890")),
+            ("\n  ---  \nJane Smith\nPhone: (987) 654-3210 | jane@mail.co.uk",
+             ("Jane Smith", "jane@mail.co.uk", "(987) 654-3210")),
+            ("jane@example.com\nhttp://example.com\nExperienced Engineer Jane Smith",
+             ("Experienced Engineer Jane Smith", "jane@example.com", "Unknown")),
+            ("Resume\n" + "Skills and experience. " * 500, ("Resume", "Unknown", "Unknown")),
+            ("", ("Unknown", "Unknown", "Unknown")),
+        ]
+        for text, expected in samples:
+            fields = self.extractor.extract(text)
+            self.assertEqual((fields['name'], fields['email'], fields['phone']), expected)
+
+    def test_first_phone_number_wins(self):
+        fields = self.extractor.extract("Bob\nCall 555-123-4567 or +1 222-333-4444")
+        self.assertEqual(fields['phone'], "555-123-4567")
+
+    def test_international_phone_keeps_country_code(self):
+        self.assertEqual(self.extractor.extract("Bob\n+1 123-456-7890")['phone'], "+1 123-456-7890")
+
+    def test_only_scans_the_head(self):
+        text = "John Doe\n" + "x" * 100 + "\njohn@example.com"
+        self.assertEqual(FieldExtractor(head_chars=50).extract(text)['email'], "Unknown")
+        self.assertEqual(FieldExtractor(head_chars=500).extract(text)['email'], "john@example.com")
+
+    def test_extra_fields(self):
+        extractor = FieldExtractor({'linkedin': LINKEDIN_PATTERN})
+        fields = extractor.extract("John Doe\njohn@example.com\nhttps://www.linkedin.com/in/john-doe\n")
+        self.assertEqual(fields['linkedin'], "https://www.linkedin.com/in/john-doe")
+        self.assertEqual(fields['phone'], "Unknown")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import ingestion
+from database import Database
+from ingestion import IngestionEngine
+from ingest_cli import IngestJournal, ingest_directory, main
+
+class TestIngestCli(unittest.TestCase):
+    def setUp(self):
+        # A small tree of resumes, with a file of another type mixed in
+        self.tmp_dir = tempfile.mkdtemp()
+        for i in range(5):
+            folder = os.path.join(self.tmp_dir, "resumes", f"team{i % 2}")
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"resume{i}.txt"), 'w', encoding='utf-8') as file:
+                file.write(f"Candidate {i}\ncandidate{i}@example.com\nPython developer.")
+        with open(os.path.join(self.tmp_dir, "resumes", "notes.csv"), 'w') as file:
+            file.write("not a resume")
+
+        self.db_file = os.path.join(self.tmp_dir, "cli.db")
+        self.journal_file = os.path.join(self.tmp_dir, "cli.journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_main(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = main([os.path.join(self.tmp_dir, "resumes"), "--db", self.db_file, "--workers", "1"])
+
+        self.assertEqual(status, 0)
+        self.assertIn("ingested:     5", output.getvalue())
+        self.assertTrue(os.path.exists(self.db_file + ".journal"))
+
+        db = Database(self.db_file)
+        self.assertEqual(db.count_resumes(), 5)
+        db.close()
+
+    def test_compress_existing_resumes(self):
+        db = Database(self.db_file)
+        db.create_tables()
+        db.add_resume("old.txt", "Old Candidate", "", "", "Python developer from before compression.")
+        db.close()
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main([os.path.join(self.tmp_dir, "resumes"), "--db", self.db_file, "--workers", "1", "--compress"])
+        self.assertIn("Compressed 1 stored resume(s)", output.getvalue())
+
+        db = Database(self.db_file)
+        db.cursor.execute("SELECT COUNT(*) FROM resumes WHERE typeof(content) = 'text'")
+        self.assertEqual(db.cursor.fetchone()[0], 0)
+        self.assertEqual(db.get_resume_by_id(1)[5], "Python developer from before compression.")
+        self.assertEqual(db.count_resumes(), 6)
+        db.close()
+
+    def test_resumes_after_interruption(self):
+        db = Database(self.db_file)
+        db.create_tables()
+        engine = IngestionEngine(db, workers=1)
+        journal = IngestJournal(self.journal_file)
+        directory = os.path.join(self.tmp_dir, "resumes")
+
+        # Interrupted after the first chunk of two files was committed
+        ingest = engine.ingest
+        chunks = []
+
+        def ingest_one_chunk(filenames):
+            chunks.append(filenames)
+            if len(chunks) > 1:
+                raise KeyboardInterrupt
+            return ingest(filenames)
+
+        with mock.patch.object(engine, "ingest", side_effect=ingest_one_chunk):
+            with self.assertRaises(KeyboardInterrupt):
+                ingest_directory(engine, directory, journal, chunk_size=2, out=io.StringIO())
+        self.assertEqual(len(journal.load()), 2)
+
+        # The re-run skips what the journal records and finishes the rest
+        stats = ingest_directory(engine, directory, journal, chunk_size=2, out=io.StringIO())
+        self.assertEqual((stats.skipped, stats.ingested, stats.failed), (2, 3, 0))
+        self.assertEqual(db.count_resumes(), 5)
+        self.assertEqual(len(journal.load()), 5)
+        db.close()
+
+    def test_retries_failed_files(self):
+        db = Database(self.db_file)
+        db.create_tables()
+        engine = IngestionEngine(db, workers=1)
+        journal = IngestJournal(self.journal_file)
+        directory = os.path.join(self.tmp_dir, "resumes")
+
+        # One file can't be read on the first run, e.g. a share that dropped out
+        parse_resume = ingestion.parse_resume
+
+        def flaky_parse(filename, *args):
+            if filename.endswith("resume0.txt"):
+                raise OSError("device not ready")
+            return parse_resume(filename, *args)
+
+        with mock.patch("ingestion.parse_resume", side_effect=flaky_parse):
+            stats = ingest_directory(engine, directory, journal, out=io.StringIO())
+        self.assertEqual((stats.ingested, stats.failed), (4, 1))
+        self.assertEqual(len(journal.load()), 4)
+
+        # The failure is journaled but not skipped, so the next run picks it up
+        stats = ingest_directory(engine, directory, journal, out=io.StringIO())
+        self.assertEqual((stats.skipped, stats.ingested, stats.failed), (4, 1, 0))
+        self.assertEqual(db.count_resumes(), 5)
+        db.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from database import Database
+import ingestion
+from ingestion import IngestionEngine
+from pdf_fixture import make_pdf
+
+class TestIngestionEngine(unittest.TestCase):
+    def setUp(self):
+        # Use a test database file
+        self.test_db_file = "test_ingestion.db"
+        if os.path.exists(self.test_db_file):
+            os.remove(self.test_db_file)
+        self.db = Database(self.test_db_file)
+        self.db.create_tables()
+        self.db.add_keyword("Python", 8)
+        self.db.add_keyword("SQL", 6)
+
+        # Write some resume files to a temporary directory
+        self.tmp_dir = tempfile.mkdtemp()
+        self.files = []
+        for i in range(4):
+            path = os.path.join(self.tmp_dir, f"resume{i}.txt")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(f"Candidate {i}\ncandidate{i}@example.com\n123-456-789{i}\n"
+                           "Python developer. Python and SQL.")
+            self.files.append(path)
+
+    def tearDown(self):
+        del self.db
+        if os.path.exists(self.test_db_file):
+            os.remove(self.test_db_file)
+        shutil.rmtree(self.tmp_dir)
+
+    def make_engine(self, **kwargs):
+        return IngestionEngine(self.db, cache_dir=os.path.join(self.tmp_dir, "cache"), **kwargs)
+
+    def test_ingest_in_process(self):
+        report = self.make_engine(workers=1).ingest(self.files)
+
+        self.assertEqual([filename for filename, _, _, _ in report], self.files)
+        self.assertTrue(all(error is None for _, _, error, _ in report))
+
+        resume = self.db.get_resume_by_id(report[0][1])
+        self.assertEqual(resume[1], "resume0.txt")
+        self.assertEqual(resume[2], "Candidate 0")
+        self.assertEqual(resume[3], "candidate0@example.com")
+        self.assertEqual(resume[4], "123-456-7890")
+
+        matches = dict((keyword, count) for keyword, count, _ in self.db.get_keyword_matches(report[0][1]))
+        self.assertEqual(matches, {"Python": 2, "SQL": 1})
+
+    def test_writer_only_inserts(self):
+        # Terms and signatures come from the parse workers, not the writer thread
+        with mock.patch("database.analyze_content") as analyze_content:
+            report = self.make_engine(workers=2).ingest(self.files)
+        analyze_content.assert_not_called()
+        self.assertIn(report[0][1], [r[0] for r in self.db.search_resumes(["SQL"])])
+        self.db.cursor.execute("SELECT COUNT(*) FROM resume_signatures")
+        self.assertEqual(self.db.cursor.fetchone()[0], len(self.files))
+
+    def test_concurrent_ingests_share_one_writer(self):
+        engine = self.make_engine(workers=1, commit_delay=0.5)
+        reports = {}
+        threads = [threading.Thread(target=lambda i=i: reports.update({i: engine.ingest([self.files[i]])}))
+                   for i in range(4)]
+        with mock.patch.object(engine, "save_batch", wraps=engine.save_batch) as save_batch:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        engine.close()
+
+        self.assertEqual(sorted(report[0][1] for report in reports.values()), [1, 2, 3, 4])
+        # Writes from all four producers were committed together
+        self.assertLess(save_batch.call_count, 4)
+        self.assertEqual(self.db.count_resumes(), 4)
+
+    def test_ingest_process_pool_reports_errors(self):
+        bad_file = os.path.join(self.tmp_dir, "resume.xyz")
+        open(bad_file, 'w').close()
+
+        report = self.make_engine(workers=2).ingest(self.files + [bad_file])
+
+        self.assertEqual(len(report), 5)
+        self.assertTrue(all(resume_id for _, resume_id, _, _ in report[:4]))
+        self.assertIsNone(report[4][1])
+        self.assertIn("Unsupported file format", report[4][2])
+        self.assertEqual(len(self.db.get_all_resumes()), 4)
+
+    def test_ingest_progress_and_cancel(self):
+        cancel = threading.Event()
+        progress = []
+
+        def on_progress(done, total):
+            progress.append((done, total))
+            if done == 2:
+                cancel.set()
+
+        report = self.make_engine(workers=1).ingest(self.files, progress=on_progress, cancel=cancel)
+
+        self.assertEqual(progress, [(1, 4), (2, 4)])
+        self.assertEqual(len(report), 2)
+        self.assertEqual(len(self.db.get_all_resumes()), 2)
+
+    def test_backfill_new_keyword(self):
+        # Keywords added before any resumes have nothing to backfill
+        self.assertEqual(self.make_engine(workers=1).backfill_keywords(), 0)
+        self.assertEqual(self.db.get_pending_backfills(), [])
+        self.make_engine(workers=1).ingest(self.files)
+
+        # A keyword added after ingestion is scored against stored resumes
+        developer_id = self.db.add_keyword("Developer", 4)
+        engine = self.make_engine(workers=1, backfill_batch_size=3)
+
+        # Interrupt after the first batch, then resume
+        cancel = threading.Event()
+        scanned = engine.backfill_keywords(progress=lambda done: cancel.set(), cancel=cancel)
+        self.assertEqual(scanned, 3)
+        self.assertEqual(self.db.get_pending_backfills()[0][3], 3)
+
+        self.assertEqual(engine.backfill_keywords(), 1)
+        self.assertEqual(self.db.get_pending_backfills(), [])
+        for resume_id, _ in self.db.get_resume_contents():
+            self.assertIn(("Developer", 1, 4), self.db.get_keyword_matches(resume_id))
+
+    def test_ingest_skips_duplicate_files(self):
+        first = self.make_engine(workers=1).ingest(self.files[:2])
+
+        # A byte-identical copy, in this batch or already stored, is linked to the existing row
+        copy = os.path.join(self.tmp_dir, "copy_of_resume2.txt")
+        shutil.copyfile(self.files[2], copy)
+        report = self.make_engine(workers=1).ingest([self.files[0], self.files[2], copy])
+
+        self.assertEqual(report[0], (self.files[0], first[0][1], None, True))
+        self.assertFalse(report[1][3])
+        self.assertEqual(report[2], (copy, report[1][1], None, True))
+        self.assertEqual(len(self.db.get_all_resumes()), 3)
+
+    def test_extraction_cache(self):
+        self.make_engine(workers=1).ingest(self.files[:1])
+        resume_id = self.db.get_resume_summaries()[0][0]
+        self.db.delete_resume(resume_id)
+
+        # Re-ingesting a known file reads its text from the cache instead of the file
+        with mock.patch("ingestion.extract_text") as extract_text:
+            report = self.make_engine(workers=1).ingest(self.files[:1])
+        extract_text.assert_not_called()
+        self.assertEqual(self.db.get_resume_by_id(report[0][1])[2], "Candidate 0")
+
+        # Without a cache_dir nothing is cached
+        self.db.delete_resume(report[0][1])
+        with mock.patch("ingestion.ExtractionCache") as cache:
+            IngestionEngine(self.db, workers=1).ingest(self.files[:1])
+        cache.assert_not_called()
+
+    def test_extraction_cache_is_bounded(self):
+        cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.make_engine(workers=1, cache_size=2).ingest(self.files[:3])
+        cache = ingestion.ExtractionCache(cache_dir)
+        hashes = [ingestion.file_hash(path) for path in self.files[:3]]
+        self.assertEqual(sum(cache.get(content_hash) is not None for content_hash in hashes), 2)
+
+        # Reading an entry keeps it over older ones
+        kept = next(content_hash for content_hash in hashes if cache.get(content_hash) is not None)
+        past = time.time() - 60
+        for content_hash in hashes:
+            if os.path.exists(cache.path(content_hash)):
+                os.utime(cache.path(content_hash), (past, past))
+        cache.get(kept)
+        cache.max_entries = 1
+        self.assertEqual(cache.prune(), 1)
+        self.assertEqual([content_hash for content_hash in hashes if cache.get(content_hash) is not None], [kept])
+
+    def test_pdf_extraction_caps(self):
+        path = os.path.join(self.tmp_dir, "portfolio.pdf")
+        with open(path, 'wb') as file:
+            file.write(make_pdf(["John Smith", "john@example.com"] + [f"Project {i}" for i in range(10)]))
+
+        self.assertEqual(ingestion.extract_text(path).count("\n"), 12)
+        self.assertEqual(ingestion.extract_text(path, max_pages=2), "John Smith\njohn@example.com\n")
+        self.assertEqual(ingestion.extract_text(path, max_chars=4), "John")
+
+        # Contact details are found in the head of the capped text
+        text = ingestion.extract_text(path, ingestion.MAX_PAGES, ingestion.MAX_CHARS)
+        self.assertEqual(ingestion.extract_contact_fields(text), ("John Smith", "john@example.com", "Unknown"))
+
+if __name__ == "__main__":
+    unittest.main()
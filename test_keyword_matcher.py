@@ -0,0 +1,38 @@
+import re
+import unittest
+from keyword_matcher import KeywordMatcher
+
+class TestKeywordMatcher(unittest.TestCase):
+    def findall_counts(self, text, keywords):
+        # The per-keyword regex scan the matcher replaces
+        counts = []
+        for keyword_id, keyword, weight in keywords:
+            count = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text, re.IGNORECASE))
+            if count > 0:
+                counts.append((keyword_id, count))
+        return sorted(counts)
+
+    def test_matches_per_keyword_scan(self):
+        keywords = [(1, "Java", 5), (2, "JavaScript", 5), (3, "Machine", 5),
+                    (4, "Machine Learning", 9), (5, "Learning", 3), (6, "C++", 7),
+                    (7, "Node.js", 6), (8, "js", 2)]
+        text = ("Java and javascript developer. Machine learning, MACHINE LEARNING and "
+                "deep learning with C++ and Node.js; js tooling. Javas and Learnings don't count.")
+
+        matcher = KeywordMatcher(keywords)
+        self.assertEqual(sorted(matcher.count(text)), self.findall_counts(text, keywords))
+        self.assertIn((4, 2), matcher.count(text))
+
+    def test_duplicate_keywords_differing_in_case(self):
+        keywords = [(1, "Python", 8), (2, "python", 4)]
+        self.assertEqual(sorted(KeywordMatcher(keywords).count("Python, PYTHON")), [(1, 2), (2, 2)])
+
+    def test_no_keywords(self):
+        self.assertEqual(KeywordMatcher([]).count("Python developer"), [])
+
+    def test_key_ignores_weights(self):
+        self.assertEqual(KeywordMatcher([(1, "Python", 8)]).key,
+                         KeywordMatcher([(1, "Python", 3)]).key)
+
+if __name__ == "__main__":
+    unittest.main()
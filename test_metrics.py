@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from database import Database
+from ingestion import IngestionEngine
+from metrics import Metrics, metrics
+
+class TestMetrics(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        recorder = Metrics(slow_query_threshold=None)
+        with recorder.timer("extract"):
+            pass
+        recorder.count("files_ingested")
+        self.assertEqual(recorder.snapshot()['stages'], {})
+        self.assertEqual(recorder.snapshot()['counters'], {})
+        # The same no-op context manager is handed out every time
+        self.assertIs(recorder.timer("extract"), recorder.timer("match"))
+
+    def test_stages_counters_and_merge(self):
+        recorder = Metrics(enabled=True)
+        for seconds in (0.01, 0.03):
+            recorder.record("match", seconds)
+        recorder.count("files_ingested", 2)
+
+        worker = Metrics(enabled=True)
+        worker.record("extract", 0.5)
+        worker.count("files_ingested")
+        recorder.merge(worker.take())
+        self.assertEqual(worker.snapshot()['stages'], {})
+
+        snapshot = json.loads(recorder.to_json())
+        self.assertEqual(snapshot['stages']['match'], {'count': 2, 'total_ms': 40.0, 'mean_ms': 20.0, 'max_ms': 30.0})
+        self.assertEqual(snapshot['stages']['extract']['count'], 1)
+        self.assertEqual(snapshot['counters'], {'files_ingested': 3})
+        self.assertIn("match", recorder.format_table())
+
+    def test_slow_query_log(self):
+        # Logged even with metrics off
+        recorder = Metrics(slow_query_threshold=0.1)
+        with self.assertLogs("resume_screening.slow_queries", "WARNING"):
+            recorder.record("search", 0.2, {'keywords': ["Python"], 'mode': "index"})
+        recorder.record("search", 0.05, {'keywords': ["SQL"], 'mode': "index"})
+
+        slow = recorder.snapshot()['slow_queries']
+        self.assertEqual([entry['keywords'] for entry in slow], [["Python"]])
+        self.assertEqual(slow[0]['ms'], 200.0)
+
+    def test_pipeline_is_instrumented(self):
+        tmp_dir = tempfile.mkdtemp()
+        db = Database(os.path.join(tmp_dir, "metrics.db"))
+        try:
+            db.create_tables()
+            db.add_keyword("Python", 8)
+            paths = []
+            for i in range(2):
+                paths.append(os.path.join(tmp_dir, f"resume{i}.txt"))
+                with open(paths[-1], 'w', encoding='utf-8') as file:
+                    file.write(f"Candidate {i}\nPython developer.")
+
+            metrics.reset()
+            metrics.enable()
+            # Recorded before the workers start, so they must not come back twice
+            metrics.record("render", 1.0)
+            metrics.count("foo", 5)
+            engine = IngestionEngine(db, workers=2, cache_dir=os.path.join(tmp_dir, "cache"))
+            engine.ingest(paths)
+            engine.close()
+            db.search_resumes(["Python"])
+            snapshot = metrics.snapshot()
+        finally:
+            metrics.enable(False)
+            metrics.reset()
+            db.close()
+            shutil.rmtree(tmp_dir)
+
+        # Stages timed in the worker processes are merged back in
+        self.assertEqual(snapshot['stages']['extract']['count'], 2)
+        self.assertEqual(snapshot['stages']['parse_fields']['count'], 2)
+        for stage in ("match", "write", "search"):
+            self.assertIn(stage, snapshot['stages'])
+        self.assertEqual(snapshot['counters']['files_ingested'], 2)
+        self.assertEqual(snapshot['counters']['resumes_written'], 2)
+        self.assertEqual(snapshot['stages']['render']['count'], 1)
+        self.assertEqual(snapshot['counters']['foo'], 5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import random
+import unittest
+from minhash import MinHasher
+
+class TestMinHasher(unittest.TestCase):
+    def setUp(self):
+        self.hasher = MinHasher()
+        rng = random.Random(7)
+        words = "python java data engineer team led built pipelines cloud services customers".split()
+        self.text = " ".join(rng.choice(words) + str(rng.randint(0, 50)) for _ in range(300))
+
+    def jaccard(self, first, second):
+        first, second = self.hasher.shingles(first), self.hasher.shingles(second)
+        return len(first & second) / len(first | second)
+
+    def test_similarity_estimates_jaccard(self):
+        words = self.text.split()
+        for edits in (3, 15, 60):
+            edited = list(words)
+            for position in range(0, len(words), len(words) // edits):
+                edited[position] = "changed"
+            edited = " ".join(edited)
+            estimate = MinHasher.similarity(self.hasher.signature(self.text), self.hasher.signature(edited))
+            self.assertAlmostEqual(estimate, self.jaccard(self.text, edited), delta=0.12)
+
+    def test_signature_is_deterministic(self):
+        signature = self.hasher.signature(self.text)
+        self.assertEqual(len(signature), 128)
+        self.assertEqual(signature, MinHasher().signature(self.text.upper()))
+        self.assertEqual(self.hasher.unpack(self.hasher.pack(signature)), signature)
+        self.assertTrue(all(0 <= value < 1 << 64 for value in signature))
+
+    def test_short_and_empty_text(self):
+        self.assertIsNone(self.hasher.signature("  -- "))
+        # Fewer words than a shingle still make one shingle, and empty bins are filled
+        signature = self.hasher.signature("Python developer")
+        self.assertEqual(MinHasher.similarity(signature, self.hasher.signature("python, developer")), 1.0)
+        self.assertLess(MinHasher.similarity(signature, self.hasher.signature("Java developer")), 0.2)
+
+    def test_band_keys(self):
+        signature = self.hasher.signature(self.text)
+        keys = self.hasher.band_keys(signature)
+        self.assertEqual(len(keys), 16)
+        self.assertTrue(all(-(1 << 63) <= key < 1 << 63 for key in keys))
+        # Changing one position changes only the key of its band
+        changed = list(signature)
+        changed[20] += 1
+        self.assertEqual([a == b for a, b in zip(keys, self.hasher.band_keys(changed))],
+                         [band != 20 // 8 for band in range(16)])
+        with self.assertRaises(ValueError):
+            MinHasher(num_hashes=100, bands=16)
+
+if __name__ == "__main__":
+    unittest.main()
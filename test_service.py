@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from database import Database
+from service import make_server
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.tmp_dir, "service.db"))
+        self.db.create_tables()
+        self.db.add_keyword("Python", 8)
+        self.db.add_keyword("SQL", 6)
+        self.db.add_resume("resume1.pdf", "John Doe", "john.doe@example.com", "123-456-7890",
+                           "Python developer. Python and SQL.")
+        self.db.add_keyword_matches_bulk([(1, 1, 2), (1, 2, 1)])
+        self.db.add_resume("resume2.pdf", "Jane Smith", "jane.smith@example.com", "987-654-3210",
+                           "Java developer who knows some Python.")
+        self.db.add_keyword_match(2, 1, 1)
+        self.db.finish_backfills([1, 2])
+
+        # Port 0 picks a free port
+        self.server = make_server(self.db, port=0, threads=4, quiet=True)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.db.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def request(self, method, path, body=None):
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        request = Request(self.url + path, data=data, method=method,
+                          headers={'Content-Type': 'application/json'})
+        try:
+            with urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_search_and_fetch(self):
+        status, payload = self.request('GET', '/search?q=python')
+        self.assertEqual(status, 200)
+        self.assertEqual([r['id'] for r in payload['results']], [1, 2])
+        self.assertEqual(payload['results'][0]['score'], 22)
+
+        # Paging follows the returned cursor
+        status, page = self.request('GET', '/search?q=python&limit=1')
+        self.assertEqual([r['id'] for r in page['results']], [1])
+        status, page = self.request('GET', f"/search?q=python&limit=1&after={page['next']}")
+        self.assertEqual([r['id'] for r in page['results']], [2])
+
+        status, resume = self.request('GET', '/resumes/1')
+        self.assertEqual(resume['name'], "John Doe")
+        self.assertEqual(resume['matches'][0], {'keyword': 'Python', 'count': 2, 'weight': 8})
+
+        self.assertEqual(self.request('GET', '/resumes/99')[0], 404)
+        self.assertEqual(self.request('GET', '/search')[0], 400)
+        self.assertEqual(self.request('GET', '/search?q=python&limit=0')[0], 400)
+        self.assertEqual(self.request('GET', '/search?q=python&limit=-5')[0], 400)
+        with mock.patch('service.MAX_LIMIT', 1):
+            status, page = self.request('GET', '/search?q=python&limit=100000')
+        self.assertEqual([r['id'] for r in page['results']], [1])
+        self.assertEqual(self.request('GET', '/nowhere')[0], 404)
+        self.assertEqual(self.request('POST', '/search', {})[0], 405)
+
+    def test_duplicates(self):
+        text = "Jane Smith. Java developer who knows some Python, SQL and a little Go."
+        self.db.add_resume("jane.pdf", "Jane Smith", "", "", text)
+        self.db.add_resume("jane_cv.pdf", "Jane Smith", "", "", text + " References on request.")
+
+        status, payload = self.request('GET', '/duplicates')
+        self.assertEqual(status, 200)
+        self.assertEqual(payload['clusters'], [[3, 4]])
+        resume = self.request('GET', '/resumes/4')[1]
+        self.assertEqual([duplicate['id'] for duplicate in resume['near_duplicates']], [3])
+        self.assertEqual(self.request('GET', '/duplicates?threshold=2')[0], 400)
+
+    def test_keywords(self):
+        status, keyword = self.request('POST', '/keywords', {'keyword': 'Java', 'weight': 7})
+        self.assertEqual(status, 200)
+        self.assertIn('Java', [k['keyword'] for k in self.request('GET', '/keywords')[1]['keywords']])
+
+        # Stored resumes are scored for the new keyword in the background
+        for _ in range(100):
+            if not self.db.get_pending_backfills():
+                break
+            time.sleep(0.05)
+        self.assertIn(('Java', 1, 7), self.db.get_keyword_matches(2))
+
+        self.assertEqual(self.request('POST', '/keywords', {'keyword': 'Go', 'weight': 11})[0], 400)
+        self.assertEqual(self.request('DELETE', f"/keywords/{keyword['id']}")[0], 200)
+        self.assertNotIn('Java', [k['keyword'] for k in self.request('GET', '/keywords')[1]['keywords']])
+
+    def test_ingest(self):
+        path = os.path.join(self.tmp_dir, "resume3.txt")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("Bob Brown\nbob.brown@example.com\nSQL and Python.")
+
+        status, payload = self.request('POST', '/ingest', {'paths': [path]})
+        self.assertEqual(status, 200)
+        self.assertEqual(payload['report'][0]['resume_id'], 3)
+        self.assertEqual(self.request('GET', '/resumes/3')[1]['name'], "Bob Brown")
+        self.assertEqual(self.request('POST', '/ingest', {'paths': 'not a list'})[0], 400)
+
+    def test_match_job_description(self):
+        body = {'text': "We need a Java developer. Java experience required.", 'limit': 5}
+        if not Database.tfidf_supported():
+            self.skipTest("NumPy and SciPy are not installed")
+        self.assertEqual(self.request('POST', '/match', body)[0], 400)
+
+        self.db.enable_tfidf()
+        status, payload = self.request('POST', '/match', body)
+        self.assertEqual(status, 200)
+        self.assertEqual(payload['results'][0]['id'], 2)
+        self.assertEqual(payload['results'][0]['terms'][0]['term'], "java")
+        self.assertEqual(self.request('POST', '/match', {'text': ""})[0], 400)
+
+    def test_concurrent_searches(self):
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda _: self.request('GET', '/search?q=python,sql'), range(64)))
+        self.assertTrue(all(status == 200 and len(payload['results']) == 2 for status, payload in results))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+import unittest
+from database import Database
+from tfidf import TfidfIndex, tfidf_supported
+
+@unittest.skipUnless(tfidf_supported(), "NumPy and SciPy are not installed")
+class TestTfidfIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.tmp_dir, "tfidf.db"))
+        self.db.create_tables()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def add(self, name, content):
+        return self.db.add_resume(f"{name}.txt", name, "", "", content)
+
+    def test_rare_terms_outweigh_common_ones(self):
+        common = [self.add(f"common{i}", "Experienced developer. Team player.") for i in range(5)]
+        rust = self.add("rust", "Experienced developer. Rust systems programming.")
+        self.db.enable_tfidf()
+
+        results = self.db.search_resumes(["developer", "Rust"], mode="tfidf")
+        self.assertEqual(results[0][0], rust)
+        self.assertEqual(sorted(row[0] for row in results[1:]), common)
+        # Words that are not keywords still rank, and unknown words match nothing
+        self.assertEqual([row[0] for row in self.db.search_resumes(["systems"], mode="tfidf")], [rust])
+        self.assertEqual(self.db.search_resumes(["cobol"], mode="tfidf"), [])
+        self.assertEqual(results[0][1:4], ("rust", "", ""))
+
+    def test_follows_inserts_and_deletes(self):
+        first = self.add("first", "Python developer")
+        index = self.db.enable_tfidf()
+        second = self.add("second", "Python and SQL")
+        self.assertEqual(sorted(row[0] for row in self.db.search_resumes(["Python"], mode="tfidf")),
+                         [first, second])
+
+        self.db.delete_resume(first)
+        self.assertEqual([row[0] for row in self.db.search_resumes(["Python"], mode="tfidf")], [second])
+
+        # Resumes deleted through another Database are dropped when found missing
+        other = Database(self.db.db_path)
+        other.delete_resume(second)
+        other.close()
+        self.assertEqual(self.db.search_resumes(["Python"], mode="tfidf"), [])
+        self.assertNotIn(second, index.rows)
+
+    def test_incremental_matches_full_rebuild(self):
+        for i in range(30):
+            self.add(f"resume{i}", f"Python SQL term{i % 7} term{i % 3} " * (1 + i % 4))
+        # Refresh on every change and merge every block, so nothing is left stale
+        index = self.db.enable_tfidf()
+        index.refresh_ratio = 0
+        index.merge_ratio = 0
+        for i in range(30, 45):
+            self.add(f"resume{i}", f"Java term{i % 5} Python")
+        self.db.delete_resume(3)
+        index.sync()
+
+        rebuilt = TfidfIndex(self.db)
+        query = ["python", "term2", "java"]
+        incremental = index.search(query)
+        expected = rebuilt.search(query)
+        self.assertEqual([resume_id for resume_id, _ in incremental], [resume_id for resume_id, _ in expected])
+        for (_, score), (_, expected_score) in zip(incremental, expected):
+            self.assertAlmostEqual(score, expected_score)
+
+    def test_search_page(self):
+        for i in range(12):
+            self.add(f"resume{i}", "Python " * (1 + i % 3) + "developer " * (1 + i))
+        self.db.enable_tfidf()
+        everything = self.db.search_resumes(["Python"], mode="tfidf")
+
+        pages = []
+        after = None
+        while True:
+            results, after = self.db.search_resumes_page(["Python"], limit=5, after=after, mode="tfidf")
+            pages.extend(results)
+            if after is None:
+                break
+        self.assertEqual(pages, everything)
+        with self.assertRaises(ValueError):
+            self.db.search_resumes_page(["Python"], limit=0, mode="tfidf")
+
+    def test_match_job_description(self):
+        backend = self.add("backend", "Backend engineer. Python, PostgreSQL and Kafka. Python services.")
+        self.add("frontend", "Frontend engineer. React and TypeScript.")
+        manager = self.add("manager", "Engineering manager. Hiring and planning.")
+        self.db.enable_tfidf()
+
+        results = self.db.match_job_description(
+            "We are hiring a backend engineer to build Python services on PostgreSQL.", limit=2)
+        # "hiring" is rarer than "engineer", so it outweighs it
+        self.assertEqual([row[0] for row in results], [backend, manager])
+        resume_id, name, _, _, score, terms = results[0]
+        self.assertEqual(name, "backend")
+        # Contributions are listed strongest first and add up to the score
+        self.assertEqual(terms[0][0], "python")
+        self.assertEqual([term for term, _ in terms], [term for term, _ in sorted(terms, key=lambda t: -t[1])])
+        self.assertAlmostEqual(sum(contribution for _, contribution in terms), score)
+
+        self.assertEqual(len(self.db.match_job_description("Python", explain=0)[0][5]), 0)
+
+    def test_cache_file(self):
+        for i in range(5):
+            self.add(f"resume{i}", f"Python developer term{i}")
+        cache_file = os.path.join(self.tmp_dir, "tfidf.npz")
+        index = self.db.enable_tfidf(cache_file)
+        self.assertEqual(index.search(["python", "term1"])[0][0], 2)
+        index.save()
+
+        # Resumes deleted and added since the save are caught up on load
+        self.db.tfidf = None
+        self.db.delete_resume(1)
+        added = self.add("added", "Python term1")
+        cached = TfidfIndex(self.db, cache_file=cache_file)
+        cached.sync()
+        self.assertNotIn(1, cached.rows)
+        self.assertEqual([resume_id for resume_id, _ in cached.search(["python", "term1"])][0], added)
+        self.assertEqual(cached.documents, 5)
+
+        # A cache written for another database is ignored
+        other = Database(os.path.join(self.tmp_dir, "other.db"))
+        other.create_tables()
+        for i in range(5):
+            other.add_resume(f"other{i}.txt", "", "", "", "Java developer")
+        index = TfidfIndex(other, cache_file=cache_file)
+        self.assertEqual([resume_id for resume_id, _ in index.search(["java"])], [5, 4, 3, 2, 1])
+        self.assertEqual(index.search(["python"]), [])
+        other.close()
+
+    def test_not_enabled(self):
+        with self.assertRaises(ValueError):
+            self.db.search_resumes(["Python"], mode="tfidf")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from database import Database
+from ingestion import IngestionEngine
+from watcher import DropFolderWatcher
+
+class TestDropFolderWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.folder = os.path.join(self.tmp_dir, "drop")
+        os.makedirs(os.path.join(self.folder, "nested"))
+
+        self.db = Database(os.path.join(self.tmp_dir, "watch.db"))
+        self.db.create_tables()
+        self.engine = IngestionEngine(self.db, workers=1, cache_dir=os.path.join(self.tmp_dir, "cache"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, name, text, age=60):
+        # age backdates the file so it counts as fully written
+        path = os.path.join(self.folder, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def make_watcher(self):
+        return DropFolderWatcher(self.engine, self.folder, settle=5)
+
+    def test_ingests_new_files_once(self):
+        first = self.write("resume1.txt", "Python developer.")
+        second = self.write(os.path.join("nested", "resume2.txt"), "Java developer.")
+        self.write("notes.csv", "not a resume")
+
+        watcher = self.make_watcher()
+        self.assertEqual(sorted(path for path, _, _, _ in watcher.poll()), sorted([first, second]))
+        self.assertEqual(self.db.count_resumes(), 2)
+
+        # Untouched files are neither re-read nor hashed, even by a new watcher
+        with mock.patch("ingestion.file_hash") as file_hash:
+            self.assertEqual(watcher.poll(), [])
+            self.assertEqual(self.make_watcher().poll(), [])
+            file_hash.assert_not_called()
+
+    def test_waits_for_files_being_written(self):
+        path = self.write("resume1.txt", "Python", age=0)
+
+        watcher = self.make_watcher()
+        self.assertEqual(watcher.poll(), [])
+
+        # Finished, but only ingested once it is seen unchanged
+        self.write("resume1.txt", "Python developer.")
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual([entry[0] for entry in watcher.poll()], [path])
+        self.assertEqual(self.db.get_resume_by_id(1)[5], "Python developer.")
+
+    def test_changed_and_removed_files(self):
+        path = self.write("resume1.txt", "Python developer.")
+        watcher = self.make_watcher()
+        old_id = watcher.poll()[0][1]
+
+        # A changed file replaces its old resume
+        self.write("resume1.txt", "Senior Python developer.", age=30)
+        new_id = watcher.poll()[0][1]
+        self.assertNotEqual(new_id, old_id)
+        self.assertIsNone(self.db.get_resume_by_id(old_id))
+        self.assertEqual(self.db.count_resumes(), 1)
+
+        # Removed files are forgotten but their resumes are kept
+        os.remove(path)
+        watcher.poll()
+        self.assertEqual(self.db.get_watched_files(self.folder), {})
+        self.assertEqual(self.db.count_resumes(), 1)
+
+    def test_touched_file_keeps_its_resume(self):
+        self.write("resume1.txt", "Python developer.")
+        watcher = self.make_watcher()
+        old_id = watcher.poll()[0][1]
+
+        # Touched without changes: linked back to its own resume, still owned
+        self.write("resume1.txt", "Python developer.", age=40)
+        self.assertEqual(watcher.poll()[0][1:], (old_id, None, True))
+
+        # So a real edit afterwards still replaces it
+        self.write("resume1.txt", "Senior Python developer.", age=30)
+        new_id = watcher.poll()[0][1]
+        self.assertIsNone(self.db.get_resume_by_id(old_id))
+        self.assertEqual([row[0] for row in self.db.get_resume_summaries()], [new_id])
+
+    def test_never_deletes_linked_resumes(self):
+        # Uploaded outside the folder, then dropped in byte for byte
+        upload = os.path.join(self.tmp_dir, "gui.txt")
+        with open(upload, 'w', encoding='utf-8') as file:
+            file.write("Python developer.")
+        uploaded_id = self.engine.ingest([upload])[0][1]
+        self.write("export.txt", "Python developer.")
+        watcher = self.make_watcher()
+        self.assertEqual(watcher.poll()[0][1:], (uploaded_id, None, True))
+        self.assertEqual(self.db.get_watched_files(self.folder)[os.path.join(self.folder, "export.txt")][3], False)
+
+        # Changing the linked file stores a new resume and keeps the upload
+        self.write("export.txt", "Senior Python developer.", age=30)
+        new_id = watcher.poll()[0][1]
+        self.assertNotEqual(new_id, uploaded_id)
+        self.assertIsNotNone(self.db.get_resume_by_id(uploaded_id))
+
+        # The watcher does own the resume it stored, so it goes on the next change
+        self.write("export.txt", "Lead Python developer.", age=20)
+        watcher.poll()
+        self.assertIsNone(self.db.get_resume_by_id(new_id))
+        self.assertEqual(self.db.count_resumes(), 2)
+
+if __name__ == "__main__":
+    unittest.main()
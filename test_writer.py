@@ -0,0 +1,108 @@
+import threading
+import time
+import unittest
+from writer import GroupCommitWriter
+
+class TestGroupCommitWriter(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+
+    def save_batch(self, items):
+        self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+    def test_coalesces_items_from_many_producers(self):
+        writer = GroupCommitWriter(self.save_batch, batch_size=50, max_delay=1.0)
+        results = {}
+
+        def produce(start):
+            futures = [(item, writer.submit(item)) for item in range(start, start + 25)]
+            for item, future in futures:
+                results[item] = future.result()
+
+        producers = [threading.Thread(target=produce, args=(start,)) for start in range(0, 100, 25)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        writer.close()
+
+        self.assertEqual(results, {item: item * 10 for item in range(100)})
+        # Full batches are written without waiting out the delay
+        self.assertEqual([len(batch) for batch in self.batches], [50, 50])
+
+    def test_flushes_partial_batch_after_delay(self):
+        writer = GroupCommitWriter(self.save_batch, batch_size=50, max_delay=0.01)
+        self.assertEqual(writer.submit(1).result(timeout=5), 10)
+        self.assertEqual(self.batches, [[1]])
+        writer.close()
+
+    def test_errors_only_fail_the_bad_items(self):
+        def save_batch(items):
+            self.batches.append(list(items))
+            if 1 in items:
+                raise ValueError("bad row")
+            return items
+
+        writer = GroupCommitWriter(save_batch, batch_size=3, max_delay=1.0)
+        futures = [writer.submit(item) for item in range(3)]
+        self.assertEqual(futures[0].result(timeout=5), 0)
+        self.assertIsInstance(futures[1].exception(timeout=5), ValueError)
+        self.assertEqual(futures[2].result(timeout=5), 2)
+        # The failed batch was retried one item at a time
+        self.assertEqual(self.batches, [[0, 1, 2], [0], [1], [2]])
+        writer.close()
+        with self.assertRaises(RuntimeError):
+            writer.submit(3)
+
+    def test_missing_results_fail_the_items(self):
+        writer = GroupCommitWriter(lambda items: [], batch_size=2, max_delay=1.0)
+        futures = [writer.submit(item) for item in range(2)]
+        for future in futures:
+            self.assertIsInstance(future.exception(timeout=5), RuntimeError)
+        writer.close()
+
+    def test_close_races_submit(self):
+        writer = GroupCommitWriter(self.save_batch, batch_size=10, max_delay=0)
+        futures = []
+
+        def produce():
+            for item in range(200):
+                try:
+                    futures.append(writer.submit(item))
+                except RuntimeError:
+                    return
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        writer.close()
+        producer.join()
+        # Everything accepted before the close is written; nothing is left hanging
+        for future in futures:
+            self.assertEqual(future.result(timeout=5) % 10, 0)
+
+    def test_full_queue_blocks_producers(self):
+        release = threading.Event()
+
+        def slow_save_batch(items):
+            release.wait()
+            return items
+
+        writer = GroupCommitWriter(slow_save_batch, batch_size=1, max_delay=0, max_queue=2)
+        # One item is being written and two fill the queue
+        for item in range(3):
+            writer.submit(item)
+        time.sleep(0.05)
+
+        blocked = threading.Thread(target=writer.submit, args=(3,))
+        blocked.start()
+        blocked.join(0.1)
+        self.assertTrue(blocked.is_alive())
+
+        release.set()
+        blocked.join(5)
+        self.assertFalse(blocked.is_alive())
+        writer.close()
+
+if __name__ == "__main__":
+    unittest.main()
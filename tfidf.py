@@ -0,0 +1,382 @@
+import math
+import os
+import threading
+import zlib
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # TF-IDF ranking is optional
+    np = sparse = None
+
+
+def tfidf_supported():
+    """Check whether NumPy and SciPy are installed"""
+    return np is not None
+
+
+class TfidfIndex:
+    """An in-memory sparse resume-by-term TF-IDF matrix built from the postings table.
+
+    Term frequencies come from the inverted index, so resume text is never
+    re-tokenized. Documents are weighted (1 + ln tf) * idf and scored by
+    cosine similarity, so common words count for little and every word in a
+    resume counts, not just the stored keywords.
+
+    The index follows the database incrementally: sync() appends resumes
+    added since the last call (by any thread or process) and remove() drops
+    deleted ones. To keep updates cheap, IDF weights and document norms are
+    only recomputed for the whole matrix once the corpus has changed by
+    more than refresh_ratio; until then new resumes are weighted with the
+    current IDF.
+
+    With a cache_file, save() writes the matrix out and the first sync()
+    starts from it instead of reading every posting back from SQLite.
+    """
+
+    def __init__(self, db, refresh_ratio=0.05, merge_ratio=0.1, cache_file=None):
+        self.db = db
+        self.cache_file = cache_file
+        self.refresh_ratio = refresh_ratio
+        self.merge_ratio = merge_ratio
+        self.lock = threading.Lock()
+
+        self.main = sparse.csc_matrix((0, 0), dtype=np.float32)  # rows x term IDs, 1 + ln tf
+        self.delta = []  # CSR blocks of rows added since main was last merged
+        self.delta_csc = None
+        self.resume_ids = np.zeros(0, dtype=np.int64)  # row -> resume ID
+        self.checks = np.zeros(0, dtype=np.int64)  # row -> CRC of the filename, to validate the cache
+        self.rows = {}  # resume ID -> row
+        self.alive = np.zeros(0, dtype=bool)
+        self.norms = np.zeros(0, dtype=np.float64)
+
+        self.df = np.zeros(0, dtype=np.int64)  # live documents containing each term ID
+        self.idf = np.zeros(0, dtype=np.float64)
+        self.documents = 0
+        self.changes = 0  # documents added or removed since IDF was last computed
+        self.max_resume_id = 0  # postings are loaded by the first sync()
+
+    def sync(self):
+        """Add resumes stored since the last sync"""
+        cursor = self.db.conn.cursor()
+        with self.lock:
+            # A resume and its postings are committed together, so every
+            # posting up to the newest committed resume is already visible
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM resumes")
+            max_resume_id = cursor.fetchone()[0]
+            if self.max_resume_id == 0 and self.cache_file and os.path.exists(self.cache_file):
+                self._load(cursor, max_resume_id)
+            if max_resume_id <= self.max_resume_id:
+                return
+
+            if self.max_resume_id == 0:
+                # Reading the whole table in key order beats a range scan of the resume_id index
+                cursor.execute("SELECT resume_id, term_id, tf FROM postings WHERE +resume_id <= ?",
+                               (max_resume_id,))
+            else:
+                cursor.execute('''
+                SELECT resume_id, term_id, tf FROM postings
+                WHERE resume_id > ? AND resume_id <= ?
+                ''', (self.max_resume_id, max_resume_id))
+            chunks = []
+            while True:
+                rows = cursor.fetchmany(100000)
+                if not rows:
+                    break
+                chunks.append(np.array(rows, dtype=np.int64))
+
+            if chunks:
+                postings = np.concatenate(chunks)
+                cursor.execute("SELECT id, filename FROM resumes WHERE id > ? AND id <= ?",
+                               (self.max_resume_id, max_resume_id))
+                self._add(postings, dict(cursor.fetchall()))
+            self.max_resume_id = max_resume_id
+
+    def _add(self, postings, filenames):
+        resume_ids, rows = np.unique(postings[:, 0], return_inverse=True)
+        term_ids = postings[:, 1]
+        weights = 1 + np.log(postings[:, 2].astype(np.float64))
+        width = max(int(term_ids.max()) + 1, len(self.df))
+
+        block = sparse.csr_matrix((weights.astype(np.float32), (rows, term_ids)),
+                                  shape=(len(resume_ids), width))
+
+        first_row = len(self.resume_ids)
+        self.resume_ids = np.concatenate([self.resume_ids, resume_ids])
+        self.checks = np.concatenate([self.checks, [_check(filenames.get(resume_id))
+                                                    for resume_id in resume_ids.tolist()]]).astype(np.int64)
+        self.rows.update(zip(resume_ids.tolist(), range(first_row, first_row + len(resume_ids))))
+        self.alive = np.concatenate([self.alive, np.ones(len(resume_ids), dtype=bool)])
+
+        self._grow(width)
+        self.df += np.bincount(term_ids, minlength=width)
+        self.documents += len(resume_ids)
+        self.changes += len(resume_ids)
+
+        # Terms first seen in this block get an IDF; the rest keep theirs
+        new_terms = (self.idf == 0) & (self.df > 0)
+        self.idf[new_terms] = self._idf(self.df[new_terms])
+        self.norms = np.concatenate([self.norms, self._norms(block)])
+        self.delta.append(block)
+        self.delta_csc = None
+
+        if self.changes > self.refresh_ratio * self.documents:
+            self._refresh()
+        elif sum(block.shape[0] for block in self.delta) > self.merge_ratio * max(self.main.shape[0], 1000):
+            self._merge()
+
+    def remove(self, resume_id):
+        """Drop a deleted resume from the index"""
+        with self.lock:
+            self._remove(resume_id)
+
+    def _remove(self, resume_id):
+        row = self.rows.pop(resume_id, None)
+        if row is None:
+            return
+        self.alive[row] = False
+        self.norms[row] = np.inf  # scores 0
+
+        matrix, offset = (self.main, 0) if row < self.main.shape[0] else (self._delta(), self.main.shape[0])
+        self.df[matrix.getrow(row - offset).indices] -= 1
+        self.documents -= 1
+        self.changes += 1
+        if self.changes > self.refresh_ratio * max(self.documents, 1):
+            self._refresh()
+
+    def _grow(self, width):
+        if width > len(self.df):
+            self.df = np.concatenate([self.df, np.zeros(width - len(self.df), dtype=np.int64)])
+            self.idf = np.concatenate([self.idf, np.zeros(width - len(self.idf))])
+
+    def _idf(self, df):
+        return np.log((1 + self.documents) / (1 + df)) + 1
+
+    def _norms(self, matrix):
+        weighted = matrix.multiply(matrix) @ (self.idf[:matrix.shape[1]] ** 2)
+        norms = np.sqrt(np.asarray(weighted).ravel())
+        # Rows without weighted terms score 0 rather than dividing by zero
+        norms[norms == 0] = np.inf
+        return norms
+
+    def _merge(self):
+        """Fold the delta blocks into the main matrix, dropping removed rows"""
+        width = len(self.df)
+        blocks = [self.main] + self.delta
+        merged = sparse.vstack([sparse.csr_matrix(block, shape=(block.shape[0], width)) if block.shape[1] < width
+                                else block for block in blocks], format='csr')
+
+        keep = np.flatnonzero(self.alive)
+        self.main = merged[keep].tocsc()
+        self.resume_ids = self.resume_ids[keep]
+        self.checks = self.checks[keep]
+        self.norms = self.norms[keep]
+        self.alive = np.ones(len(keep), dtype=bool)
+        self.rows = dict(zip(self.resume_ids.tolist(), range(len(keep))))
+        self.delta = []
+        self.delta_csc = None
+
+    def _refresh(self):
+        """Recompute IDF weights and every document norm"""
+        self._merge()
+        self.idf = self._idf(self.df)
+        self.idf[self.df == 0] = 0
+        self.norms = self._norms(self.main)
+        self.changes = 0
+
+    def save(self):
+        """Write the matrix to cache_file for the next start-up"""
+        if not self.cache_file:
+            return
+        cursor = self.db.conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        version = cursor.fetchone()[0]
+        with self.lock:
+            self._merge()
+            temporary = self.cache_file + ".tmp"
+            with open(temporary, 'wb') as file:
+                np.savez(file, data=self.main.data, indices=self.main.indices, indptr=self.main.indptr,
+                         shape=np.array(self.main.shape), resume_ids=self.resume_ids, checks=self.checks,
+                         norms=self.norms, df=self.df, idf=self.idf,
+                         counts=np.array([self.documents, self.changes, self.max_resume_id]),
+                         version=np.array(version))
+            os.replace(temporary, self.cache_file)
+
+    def _load(self, cursor, max_resume_id):
+        try:
+            with np.load(self.cache_file) as cached:
+                arrays = {name: cached[name] for name in cached.files}
+        except (OSError, ValueError, KeyError):
+            return
+        documents, changes, cached_max = arrays['counts'].tolist()
+        if cached_max > max_resume_id:
+            return
+        # A schema migration may have re-indexed every resume since
+        cursor.execute("PRAGMA user_version")
+        if 'version' not in arrays or int(arrays['version']) != cursor.fetchone()[0]:
+            return
+
+        # Every stored resume the cache covers must be in it under the same
+        # filename; otherwise the cache belongs to another database
+        cursor.execute("SELECT id, filename FROM resumes WHERE id <= ?", (cached_max,))
+        stored = cursor.fetchall()
+        rows = dict(zip(arrays['resume_ids'].tolist(), range(len(arrays['resume_ids']))))
+        checks = arrays['checks']
+        if any(resume_id not in rows or checks[rows[resume_id]] != _check(filename)
+               for resume_id, filename in stored):
+            return
+
+        self.main = sparse.csc_matrix((arrays['data'], arrays['indices'], arrays['indptr']),
+                                      shape=tuple(arrays['shape']))
+        self.resume_ids = arrays['resume_ids']
+        self.checks = checks
+        self.rows = rows
+        self.alive = np.ones(len(rows), dtype=bool)
+        self.norms = arrays['norms']
+        self.df = arrays['df']
+        self.idf = arrays['idf']
+        self.documents = documents
+        self.changes = changes
+        self.max_resume_id = cached_max
+
+        # Drop resumes deleted since the cache was written
+        for resume_id in set(rows) - {resume_id for resume_id, _ in stored}:
+            self._remove(resume_id)
+
+    def _delta(self):
+        if self.delta_csc is None:
+            width = len(self.df)
+            self.delta_csc = sparse.vstack([sparse.csr_matrix(block, shape=(block.shape[0], width))
+                                            for block in self.delta], format='csc') if self.delta else None
+        return self.delta_csc
+
+    def query_vector(self, terms):
+        """Map query terms to (term IDs, weights, terms), skipping terms no resume contains"""
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), []
+
+        cursor = self.db.conn.cursor()
+        found = []
+        # Job descriptions can have more distinct words than SQLite allows parameters
+        unique = list(counts)
+        for start in range(0, len(unique), 500):
+            batch = unique[start:start + 500]
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(f"SELECT id, term FROM terms WHERE term IN ({placeholders})", batch)
+            found.extend(cursor.fetchall())
+
+        term_ids = []
+        weights = []
+        matched = []
+        for term_id, term in sorted(found):
+            if term_id < len(self.idf) and self.idf[term_id] > 0:
+                term_ids.append(term_id)
+                weights.append((1 + math.log(counts[term])) * self.idf[term_id])
+                matched.append(term)
+        return np.array(term_ids, dtype=np.int64), np.array(weights), matched
+
+    def scores(self, term_ids, weights):
+        """Cosine similarity of every row to the query, as an array over rows"""
+        scores = np.zeros(len(self.resume_ids))
+        if not len(term_ids):
+            return scores
+
+        # Only the query's columns are touched; the query norm doesn't change the ranking
+        query = weights * self.idf[term_ids]
+        offset = 0
+        for matrix in (self.main, self._delta()):
+            if matrix is None or not matrix.shape[0]:
+                continue
+            inside = term_ids < matrix.shape[1]
+            if inside.any():
+                columns = matrix[:, term_ids[inside]]
+                scores[offset:offset + matrix.shape[0]] = columns @ query[inside]
+            offset += matrix.shape[0]
+        query_norm = math.sqrt(float(weights @ weights)) or 1.0
+        return scores / self.norms / query_norm
+
+    def contributions(self, rows, term_ids, weights):
+        """Each query term's share of each row's score, as a len(rows) x len(term_ids) array"""
+        query = weights * self.idf[term_ids] / (math.sqrt(float(weights @ weights)) or 1.0)
+        shares = np.zeros((len(rows), len(term_ids)))
+        offset = 0
+        for matrix in (self.main, self._delta()):
+            if matrix is None or not matrix.shape[0]:
+                continue
+            # Pick the rows' entries out of the query's columns; a single
+            # row of a CSC matrix costs a scan of the whole matrix
+            inside = np.flatnonzero(term_ids < matrix.shape[1])
+            positions = np.full(matrix.shape[0], -1)
+            local = (rows >= offset) & (rows < offset + matrix.shape[0])
+            positions[rows[local] - offset] = np.flatnonzero(local)
+            if local.any() and len(inside):
+                columns = matrix[:, term_ids[inside]]
+                column_of = inside[np.repeat(np.arange(len(inside)), np.diff(columns.indptr))]
+                position_of = positions[columns.indices]
+                hits = position_of >= 0
+                shares[position_of[hits], column_of[hits]] = columns.data[hits] * query[column_of[hits]]
+            offset += matrix.shape[0]
+        return shares / self.norms[rows][:, None]
+
+    def search(self, terms, limit=None, after=None):
+        """Return [(resume_id, score)] ranked by score then resume ID, both descending.
+
+        after is the (score, resume_id) of the last row of the previous page.
+        """
+        self.sync()
+        with self.lock:
+            term_ids, weights, _ = self.query_vector(terms)
+            scores = self.scores(term_ids, weights)
+            resume_ids = self.resume_ids
+
+        ranked = self._rank(scores, resume_ids, limit, after)
+        return list(zip(resume_ids[ranked].tolist(), scores[ranked].tolist()))
+
+    def match(self, terms, limit=10, explain=10):
+        """Rank resumes against a whole document such as a job description.
+
+        Returns [(resume_id, score, [(term, contribution), ...])] for the top
+        `limit` resumes; the contributions of a resume's `explain` strongest
+        terms sum to at most its score.
+        """
+        self.sync()
+        with self.lock:
+            term_ids, weights, matched = self.query_vector(terms)
+            scores = self.scores(term_ids, weights)
+            resume_ids = self.resume_ids
+            ranked = self._rank(scores, resume_ids, limit)
+            shares = self.contributions(ranked, term_ids, weights)
+
+        results = []
+        for row, row_shares in zip(ranked, shares):
+            strongest = [column for column in np.argsort(-row_shares, kind='stable')[:explain]
+                         if row_shares[column] > 0]
+            results.append((int(resume_ids[row]), float(scores[row]),
+                            [(matched[column], float(row_shares[column])) for column in strongest]))
+        return results
+
+    @staticmethod
+    def _rank(scores, resume_ids, limit=None, after=None):
+        """Rows with a positive score, best first, after the (score, resume_id) cursor"""
+        candidates = np.flatnonzero(scores > 0)
+        if after is not None:
+            score, resume_id = after
+            candidate_scores = scores[candidates]
+            candidates = candidates[(candidate_scores < score) |
+                                    ((candidate_scores == score) & (resume_ids[candidates] < resume_id))]
+
+        if limit is not None and len(candidates) > limit:
+            # Partial selection keeps this O(n) until the final small sort
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            threshold = scores[candidates[top]].min()
+            candidates = candidates[scores[candidates] >= threshold]
+
+        order = np.lexsort((-resume_ids[candidates], -scores[candidates]))
+        return candidates[order][:limit]
+
+
+def _check(filename):
+    return zlib.crc32((filename or "").encode('utf-8'))
@@ -0,0 +1,186 @@
+import os
+import time
+from ingestion import RESUME_EXTENSIONS
+
+
+class DropFolderWatcher:
+    """Poll a folder tree and ingest resumes that are new or have changed.
+
+    Each file's (mtime, size) is recorded in the database once it has been
+    handled, so untouched files are never read or hashed again, including
+    after a restart. Only directories whose mtime has changed are listed on
+    each poll; a full sweep every full_scan_every polls also catches files
+    rewritten in place. A file is ingested once its mtime is at least
+    settle seconds old and its mtime and size are unchanged since it was
+    last seen, so files that are still being written wait for a later poll.
+    """
+
+    def __init__(self, engine, directory, interval=5.0, settle=2.0, full_scan_every=60,
+                 chunk_size=1000, extensions=RESUME_EXTENSIONS):
+        self.engine = engine
+        self.db = engine.db
+        self.directory = os.path.abspath(directory)
+        self.interval = interval
+        self.settle = settle
+        self.full_scan_every = full_scan_every
+        # Files ingested and recorded together, bounding the work lost to a crash
+        self.chunk_size = chunk_size
+        self.extensions = extensions
+
+        self.files = self.db.get_watched_files(self.directory)  # path -> (mtime_ns, size, resume_id, owned)
+        self.files_by_directory = {}  # directory -> paths in self.files
+        for path in self.files:
+            self.files_by_directory.setdefault(os.path.dirname(path), set()).add(path)
+        self.dirs = {}  # directory -> mtime_ns when it was last listed
+        self.subdirs = {}  # directory -> its subdirectories when it was last listed
+        self.pending = {}  # path -> (mtime_ns, size) of a new or changed file, waiting to settle
+        self.polls = 0
+
+    def run(self, cancel=None, on_report=None):
+        """Poll until the optional cancel event is set"""
+        while cancel is None or not cancel.is_set():
+            report = self.poll()
+            if report and on_report is not None:
+                on_report(report)
+            if cancel is not None:
+                cancel.wait(self.interval)
+            else:
+                time.sleep(self.interval)
+
+    def poll(self):
+        """Run one polling cycle; returns the ingestion report for files handled"""
+        full_scan = self.polls % self.full_scan_every == 0
+        self.polls += 1
+
+        removed = []
+        for directory in self.changed_directories(full_scan, removed):
+            removed.extend(self.scan_directory(directory))
+
+        # Files already waiting are checked directly, since their directory
+        # may not change again
+        ready = []
+        for path, signature in list(self.pending.items()):
+            current = self.signature(path)
+            if current is None:
+                del self.pending[path]
+            elif current != signature:
+                self.pending[path] = current
+            elif time.time() - current[0] / 1e9 >= self.settle:
+                ready.append(path)
+
+        if removed:
+            self.db.delete_watched_files(removed)
+
+        report = []
+        for start in range(0, len(ready), self.chunk_size):
+            report.extend(self.ingest(ready[start:start + self.chunk_size]))
+        return report
+
+    def changed_directories(self, full_scan, removed):
+        """Yield directories to list: new ones, changed ones, or all of them on a full scan.
+
+        Recorded files under directories that have disappeared are added to removed.
+        """
+        stack = [self.directory]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                removed.extend(self.forget_directory(directory))
+                continue
+
+            if full_scan or self.dirs.get(directory) != mtime_ns:
+                # A directory modified just now may change again within the same
+                # mtime tick, so it is listed again until its mtime has settled
+                settled = time.time() - mtime_ns / 1e9 >= self.settle
+                self.dirs[directory] = mtime_ns if settled else None
+                yield directory
+            stack.extend(self.subdirs.get(directory, ()))
+
+    def scan_directory(self, directory):
+        """List a directory, queueing new and changed files; returns recorded files that are gone"""
+        present = set()
+        subdirs = set()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.add(entry.path)
+                    continue
+                if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in self.extensions:
+                    continue
+
+                present.add(entry.path)
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+                known = self.files.get(entry.path)
+                if (known is None or known[:2] != signature) and entry.path not in self.pending:
+                    self.pending[entry.path] = signature
+
+        removed = []
+        for subdirectory in self.subdirs.get(directory, set()) - subdirs:
+            removed.extend(self.forget_directory(subdirectory))
+        self.subdirs[directory] = subdirs
+
+        for path in self.files_by_directory.get(directory, set()) - present:
+            self.forget_file(path)
+            removed.append(path)
+        return removed
+
+    def forget_directory(self, directory):
+        """Drop a removed directory and everything under it; returns its recorded files"""
+        removed = []
+        for subdirectory in self.subdirs.pop(directory, ()):
+            removed.extend(self.forget_directory(subdirectory))
+        self.dirs.pop(directory, None)
+
+        for path in list(self.files_by_directory.get(directory, ())):
+            self.forget_file(path)
+            removed.append(path)
+        for path in [path for path in self.pending if os.path.dirname(path) == directory]:
+            del self.pending[path]
+        return removed
+
+    def forget_file(self, path):
+        del self.files[path]
+        self.files_by_directory[os.path.dirname(path)].discard(path)
+        self.pending.pop(path, None)
+
+    @staticmethod
+    def signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def ingest(self, paths):
+        """Ingest settled files in batches and record them so they aren't read again"""
+        signatures = {path: self.pending.pop(path) for path in paths}
+        report = self.engine.ingest(paths)
+
+        recorded = []
+        replaced = []
+        for path, resume_id, error, duplicate in report:
+            previous = self.files.get(path)
+            mtime_ns, size = signatures[path]
+            # A duplicate is only linked to a resume stored some other way,
+            # unless it is this file's own resume (touched, not changed)
+            owned = resume_id is not None and not duplicate
+            if duplicate and previous is not None and previous[2] == resume_id:
+                owned = previous[3]
+            self.files[path] = (mtime_ns, size, resume_id, owned)
+            self.files_by_directory.setdefault(os.path.dirname(path), set()).add(path)
+            recorded.append((path, mtime_ns, size, resume_id, owned))
+            if previous is not None and previous[3] and previous[2] is not None and previous[2] != resume_id:
+                replaced.append(previous[2])
+        self.db.save_watched_files(recorded)
+
+        # A changed file replaces the resume stored from its old contents,
+        # unless another watched file still refers to that resume. Resumes
+        # the file was only linked to are never deleted.
+        in_use = {resume_id for _, _, resume_id, _ in self.files.values()} if replaced else set()
+        for resume_id in replaced:
+            if resume_id not in in_use:
+                self.db.delete_resume(resume_id)
+        return report
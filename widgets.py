@@ -0,0 +1,109 @@
+import tkinter as tk
+from tkinter import font as tkfont
+
+
+class VirtualListbox:
+    """Drive a tk.Listbox that only holds the rows currently on screen.
+
+    Rows are fetched on demand with fetch(offset, limit), which returns a
+    list of (key, text) pairs, and count() gives the total number of rows.
+    Scrolling, resizing and refreshing only ever touch one window of rows,
+    so the list costs the same with 100 or 100,000 entries.
+    """
+
+    def __init__(self, listbox, scrollbar, fetch, count):
+        self.listbox = listbox
+        self.scrollbar = scrollbar
+        self.fetch = fetch
+        self.count = count
+
+        self.offset = 0
+        self.total = 0
+        self.keys = []  # keys of the rows currently shown
+
+        self.scrollbar.config(command=self.on_scroll)
+        self.listbox.config(yscrollcommand='')
+        self.listbox.bind('<Configure>', lambda event: self.render())
+        self.listbox.bind('<MouseWheel>', self.on_mousewheel)  # Windows and macOS
+        self.listbox.bind('<Button-4>', lambda event: self.scroll_by(-3))  # Linux
+        self.listbox.bind('<Button-5>', lambda event: self.scroll_by(3))
+        self.listbox.bind('<Up>', lambda event: self.move_selection(-1))
+        self.listbox.bind('<Down>', lambda event: self.move_selection(1))
+
+    def visible_rows(self):
+        """Number of rows that fit in the listbox at its current size"""
+        linespace = tkfont.Font(font=self.listbox.cget('font')).metrics('linespace')
+        height = self.listbox.winfo_height()
+        if height <= 1:
+            # Not mapped yet; fall back to the configured height in lines
+            return int(self.listbox.cget('height'))
+        return max(1, height // (linespace + 1))
+
+    def refresh(self):
+        """Re-read the row count and the visible window, e.g. after inserts or deletes"""
+        self.total = self.count()
+        self.render()
+
+    def render(self):
+        """Fetch and show the rows for the current offset"""
+        visible = self.visible_rows()
+        self.offset = max(0, min(self.offset, self.total - visible))
+
+        selected = self.selected_key()
+        rows = self.fetch(self.offset, visible) if self.total else []
+
+        self.listbox.delete(0, tk.END)
+        self.keys = []
+        for key, text in rows:
+            self.listbox.insert(tk.END, text)
+            self.keys.append(key)
+
+        if selected in self.keys:
+            self.listbox.selection_set(self.keys.index(selected))
+
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, (self.offset + len(rows)) / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, offset):
+        self.offset = offset
+        self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return 'break'
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units' | 'pages')"""
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.total))
+        elif unit == 'pages':
+            self.scroll_by(int(amount) * self.visible_rows())
+        else:
+            self.scroll_by(int(amount))
+
+    def on_mousewheel(self, event):
+        return self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def move_selection(self, step):
+        """Move the selection with the arrow keys, scrolling at the window edges"""
+        selection = self.listbox.curselection()
+        index = selection[0] + step if selection else 0
+
+        if index < 0 or index >= len(self.keys):
+            self.scroll_by(step)
+            index = max(0, min(index, len(self.keys) - 1))
+
+        self.listbox.selection_clear(0, tk.END)
+        if self.keys:
+            self.listbox.selection_set(index)
+            self.listbox.activate(index)
+        return 'break'
+
+    def selected_key(self):
+        """Key of the selected row, or None"""
+        selection = self.listbox.curselection()
+        if not selection or selection[0] >= len(self.keys):
+            return None
+        return self.keys[selection[0]]
@@ -0,0 +1,104 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Funnel writes from many producer threads through one writer thread.
+
+    submit(item) queues an item and returns a Future for its result. The
+    writer thread takes up to batch_size queued items, waiting at most
+    max_delay seconds after the first for more to arrive, and passes them
+    to save_batch(items) in one call, which should write them in a single
+    transaction and return one result per item. If it raises, the items are
+    retried one per call, so only the ones that fail on their own get the
+    error. The queue holds at most max_queue
+    items; submit blocks while it is full, so producers slow to the pace
+    the database can take instead of piling up memory.
+    """
+
+    def __init__(self, save_batch, batch_size=100, max_delay=0.05, max_queue=1000):
+        self.save_batch = save_batch
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.closed = False
+        # Orders submit() against close(), so nothing is queued after _STOP
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, name="GroupCommitWriter", daemon=True)
+        self.thread.start()
+
+    def submit(self, item):
+        """Queue an item for writing, blocking while the queue is full"""
+        future = Future()
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("writer is closed")
+            self.queue.put((item, future))
+        return future
+
+    def close(self):
+        """Write everything queued so far and stop the writer thread"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.queue.put(_STOP)
+        self.thread.join()
+
+    def run(self):
+        try:
+            self.loop()
+        finally:
+            # Fail whatever the loop left behind rather than leave it waiting
+            while True:
+                try:
+                    entry = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is not _STOP:
+                    entry[1].set_exception(RuntimeError("writer is closed"))
+
+    def loop(self):
+        stopping = False
+        while not stopping:
+            entry = self.queue.get()
+            if entry is _STOP:
+                break
+
+            batch = [entry]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self.queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self.write(batch)
+
+    def write(self, batch):
+        try:
+            results = self.save(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Find the items that fail on their own instead of failing them all
+            for entry in batch:
+                self.write([entry])
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def save(self, batch):
+        results = list(self.save_batch([item for item, _ in batch]))
+        if len(results) != len(batch):
+            raise RuntimeError(f"save_batch returned {len(results)} results for {len(batch)} items")
+        return results